@@ -0,0 +1,515 @@
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+
+
+"""
+Latency and throughput of the HTTP routes, measured in process.
+
+`main.app` is booted through its lifespan and driven over httpx's ASGI
+transport, so the numbers cover routing, validation, the database round
+trips and serialisation but not a real socket. Files go to LocalStorage in
+a temporary directory and the response cache is disabled unless
+RESPONSE_CACHE_TTL is set, so list requests reach the database.
+
+The database is, in order of preference:
+
+    BENCH_DATABASE_URI   An existing server; a scratch database is created
+                         on it and dropped afterwards.
+    mongod               Started on a free port in a temporary directory
+                         when the binary is on PATH.
+    mongomock-motor      In-memory stand-in when the package is installed.
+                         Useful to catch regressions in the Python code, not
+                         to compare query plans.
+
+Each scenario is run with a fixed number of requests and concurrency and
+reported as p50/p95/p99 latency in milliseconds plus requests per second.
+`--output` writes the results as a JSON baseline; `--compare` reads one
+back and exits with status 1 when a scenario's p95 grew, or its
+throughput dropped, by more than `--threshold`.
+
+A scenario with any failed request is reported as FAILED and also makes
+the run exit with status 1, since its timings measure the error path.
+Scenarios the mock database cannot serve are skipped, with a note, when
+running on mongomock.
+
+Usage:
+    python benchmarks/endpoints.py --output baseline.json
+    python benchmarks/endpoints.py --compare baseline.json --threshold 0.2
+    python benchmarks/endpoints.py --scenario books_list books_detail
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DATABASE = "kennapartner_bench"
+USERNAME = "bench_admin"
+PASSWORD = "bench_pass_123"
+SEARCH_TERMS = ["history", "market", "policy", "science", "culture"]
+
+# Scenarios mongomock cannot run, with the reason printed when skipping.
+MOCK_UNSUPPORTED = {
+    "books_list_text": "$text search",
+    "news_list_text": "$text search",
+    "insights_list_text": "$text search",
+    "news_list_summary": "$substrCP",
+    "insights_list_summary": "$substrCP",
+    "insights_create": "upserts in bulk_write",
+}
+
+
+def png(width: int = 64, height: int = 64) -> bytes:
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    row = b"\x00" + bytes(range(256))[: width * 3].ljust(width * 3, b"\x80")
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(row * height))
+        + chunk(b"IEND", b"")
+    )
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_mongod(directory: str) -> Optional[subprocess.Popen]:
+    binary = shutil.which("mongod")
+    if binary is None:
+        return None
+    port = free_port()
+    path = os.path.join(directory, "db")
+    os.makedirs(path)
+    process = subprocess.Popen(
+        [binary, "--dbpath", path, "--port", str(port), "--bind_ip", "127.0.0.1"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            os.environ["DATABASE_URI"] = f"mongodb://127.0.0.1:{port}"
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("mongod did not start")
+
+
+def use_mock_database():
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError:
+        raise SystemExit(
+            "No database available: set BENCH_DATABASE_URI, put mongod on PATH "
+            "or install mongomock-motor"
+        )
+    from src.kennapartner_backend.utils import database
+
+    client = AsyncMongoMockClient()
+    database.AsyncIOMotorClient = lambda uri, **options: client
+    return "mongomock"
+
+
+def prepare_environment(directory: str) -> tuple:
+    os.environ["STORAGE_BACKEND"] = "local"
+    os.environ["STORAGE_LOCAL_ROOT"] = os.path.join(directory, "media")
+    os.environ["UPLOAD_SPOOL_DIR"] = os.path.join(directory, "spool")
+    os.environ["DATABASE_NAME"] = BENCH_DATABASE
+    os.environ.setdefault("RESPONSE_CACHE_TTL", "0")
+    os.environ.setdefault("JWT_SECRET", "benchmark-secret-" + "x" * 32)
+    sys.path.insert(0, ROOT)
+
+    if os.getenv("BENCH_DATABASE_URI"):
+        os.environ["DATABASE_URI"] = os.environ["BENCH_DATABASE_URI"]
+        return "uri", None
+    process = start_mongod(directory)
+    if process is not None:
+        return "mongod", process
+    return use_mock_database(), None
+
+
+async def seed(books: int, news: int, insights: int, authors: int) -> dict:
+    from src.kennapartner_backend.modules import (
+        User,
+        Book,
+        News,
+        Insight,
+        InsightAuthor,
+    )
+    from src.kennapartner_backend.helpers import hash_password
+    from beanie import PydanticObjectId
+
+    rng = random.Random(1)
+    now = datetime.now(timezone.utc)
+
+    def text(words: int) -> str:
+        vocabulary = SEARCH_TERMS + ["the", "of", "and"]
+        return " ".join(rng.choice(vocabulary) for _ in range(words))
+
+    def stamped(document):
+        # insert_many skips the insert hooks, so ids and timestamps are set
+        # here as in bulk_insert.
+        document.id = PydanticObjectId()
+        document.created_at = now
+        document.updated_at = now
+        return document
+
+    async def insert(model, documents: list) -> List[str]:
+        for start in range(0, len(documents), 1000):
+            await model.insert_many(documents[start : start + 1000])
+        return [str(document.id) for document in documents]
+
+    await insert(
+        User, [stamped(User(username=USERNAME, password=await hash_password(PASSWORD)))]
+    )
+    book_ids = await insert(
+        Book,
+        [
+            stamped(
+                Book(
+                    name=f"Book {index} {text(3)}",
+                    introduction=text(120),
+                    preface=text(80),
+                    foreword=text(80),
+                    author=f"Author {index % 50}",
+                    date=now - timedelta(days=index),
+                )
+            )
+            for index in range(books)
+        ],
+    )
+    news_ids = await insert(
+        News,
+        [
+            stamped(News(title=f"News {index} {text(3)}", content=text(300)))
+            for index in range(news)
+        ],
+    )
+    author_documents = [
+        stamped(
+            InsightAuthor(
+                full_name=f"Author {index}", email=f"author{index}@example.com"
+            )
+        )
+        for index in range(authors)
+    ]
+    await insert(InsightAuthor, author_documents)
+    insight_ids = await insert(
+        Insight,
+        [
+            stamped(
+                Insight(
+                    title=f"Insight {index} {text(3)}",
+                    content=text(300),
+                    authors=rng.sample(author_documents, k=min(3, authors)),
+                )
+            )
+            for index in range(insights)
+        ],
+    )
+    return {"books": book_ids, "news": news_ids, "insights": insight_ids}
+
+
+Request = Callable[[object, int], Awaitable[object]]
+
+
+def scenarios(ids: dict, headers: dict) -> Dict[str, Request]:
+    image = png()
+    year = str(datetime.now(timezone.utc).year)
+
+    def get(path: str, params: Callable[[int], dict] = lambda _: {}) -> Request:
+        return lambda client, index: client.get(path, params=params(index))
+
+    def detail(resource: str) -> Request:
+        return lambda client, index: client.get(
+            f"/api/v1/{resource}/{ids[resource][index % len(ids[resource])]}"
+        )
+
+    def term(index: int) -> str:
+        return SEARCH_TERMS[index % len(SEARCH_TERMS)]
+
+    def create_book(client, index):
+        return client.post(
+            "/api/v1/books/",
+            headers=headers,
+            json={
+                "name": f"Bench book {index} {time.time_ns()}",
+                "introduction": "Introduction",
+                "preface": "Preface",
+                "foreword": "Foreword",
+                "author": "Bench",
+                "date": "2024-01-01T00:00:00",
+            },
+        )
+
+    def create_news(client, index):
+        return client.post(
+            "/api/v1/news/",
+            headers=headers,
+            json={
+                "title": f"Bench news {index} {time.time_ns()}",
+                "content": "Content",
+            },
+        )
+
+    def create_insight(client, index):
+        return client.post(
+            "/api/v1/insights/",
+            headers=headers,
+            json={
+                "title": f"Bench insight {index} {time.time_ns()}",
+                "content": "Content",
+                "authors": [
+                    {"full_name": "Bench", "email": f"bench{index % 5}@example.com"}
+                ],
+            },
+        )
+
+    def upload(resource: str) -> Request:
+        def request(client, index):
+            id = ids[resource][index % len(ids[resource])]
+            # Distinct bytes per request, so every upload is a new asset.
+            content = image + index.to_bytes(4, "big")
+            return client.patch(
+                f"/api/v1/{resource}/{id}/upload",
+                headers=headers,
+                files={"file": ("bench.png", content, "image/png")},
+            )
+
+        return request
+
+    def login(client, index):
+        return client.post(
+            "/api/v1/auth/login", json={"username": USERNAME, "password": PASSWORD}
+        )
+
+    return {
+        "books_list": get("/api/v1/books/", lambda index: {"page": index % 10 + 1}),
+        "books_list_year": get("/api/v1/books/", lambda _: {"year": year}),
+        "books_list_text": get("/api/v1/books/", lambda index: {"query": term(index)}),
+        "books_list_prefix": get(
+            "/api/v1/books/",
+            lambda index: {
+                "query": "Book 1",
+                "search": "prefix",
+                "page": index % 3 + 1,
+            },
+        ),
+        "books_list_fields": get(
+            "/api/v1/books/", lambda _: {"fields": "name,author", "limit": 50}
+        ),
+        "books_detail": detail("books"),
+        "books_create": create_book,
+        "books_upload": upload("books"),
+        "news_list": get("/api/v1/news/", lambda index: {"page": index % 10 + 1}),
+        "news_list_year": get("/api/v1/news/", lambda _: {"year": year}),
+        "news_list_text": get("/api/v1/news/", lambda index: {"query": term(index)}),
+        "news_list_summary": get(
+            "/api/v1/news/", lambda _: {"summary_length": 200, "limit": 50}
+        ),
+        "news_detail": detail("news"),
+        "news_create": create_news,
+        "news_upload": upload("news"),
+        "insights_list": get(
+            "/api/v1/insights/", lambda index: {"page": index % 10 + 1}
+        ),
+        "insights_list_unexpanded": get(
+            "/api/v1/insights/", lambda _: {"expand": "none"}
+        ),
+        "insights_list_text": get(
+            "/api/v1/insights/", lambda index: {"query": term(index)}
+        ),
+        "insights_list_summary": get(
+            "/api/v1/insights/", lambda _: {"summary_length": 200, "limit": 50}
+        ),
+        "insights_detail": detail("insights"),
+        "insights_create": create_insight,
+        "login": login,
+    }
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> dict:
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(cuts[49] * 1000, 3),
+        "p95_ms": round(cuts[94] * 1000, 3),
+        "p99_ms": round(cuts[98] * 1000, 3),
+        "rps": round(len(latencies) / elapsed, 1),
+    }
+
+
+async def measure(client, request: Request, requests: int, concurrency: int) -> dict:
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for index in counter:
+            started = time.perf_counter()
+            response = await request(client, index)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def run(arguments) -> dict:
+    import httpx
+    import main
+    from src.kennapartner_backend.helpers import create_tokens
+    from src.kennapartner_backend.modules import User
+    from src.kennapartner_backend.utils import get_client
+
+    results = {}
+    async with main.app.router.lifespan_context(main.app):
+        database = get_client()[BENCH_DATABASE]
+        await asyncio.gather(
+            *(
+                database[name].delete_many({})
+                for name in await database.list_collection_names()
+            )
+        )
+        ids = await seed(
+            arguments.books, arguments.news, arguments.insights, arguments.authors
+        )
+        user = await User.find_one(User.username == USERNAME)
+        headers = {"Authorization": f"Bearer {create_tokens(str(user.id))[0]}"}
+
+        selected = scenarios(ids, headers)
+        names = arguments.scenario or list(selected)
+        if arguments.database == "mongomock":
+            for name in [name for name in names if name in MOCK_UNSUPPORTED]:
+                print(
+                    f"{name:<26} skipped: no {MOCK_UNSUPPORTED[name]} on mongomock",
+                    file=sys.stderr,
+                )
+            names = [name for name in names if name not in MOCK_UNSUPPORTED]
+        # Failures are counted per scenario instead of aborting the run, and
+        # reported once every scenario has been measured.
+        transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            for name in names:
+                # A short warm up fills the pools and caches the code paths.
+                await measure(
+                    client, selected[name], arguments.concurrency, arguments.concurrency
+                )
+                requests = arguments.requests
+                if name == "login":
+                    requests = min(requests, arguments.login_requests)
+                results[name] = await measure(
+                    client, selected[name], requests, arguments.concurrency
+                )
+                print(format_row(name, results[name]), file=sys.stderr)
+
+        if arguments.database == "uri":
+            await get_client().drop_database(BENCH_DATABASE)
+    return results
+
+
+def format_row(name: str, result: dict) -> str:
+    return (
+        f"{name:<26} p50 {result['p50_ms']:>8.2f} ms  p95 {result['p95_ms']:>8.2f} ms  "
+        f"p99 {result['p99_ms']:>8.2f} ms  {result['rps']:>8.1f} req/s  "
+        f"{result['errors']} errors" + ("  FAILED" if result["errors"] else "")
+    )
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> List[str]:
+    regressions = []
+    for name, result in results.items():
+        previous = baseline["scenarios"].get(name)
+        if previous is None or result["errors"] or previous.get("errors"):
+            continue
+        if result["p95_ms"] > previous["p95_ms"] * (1 + threshold):
+            regressions.append(
+                f"{name}: p95 {previous['p95_ms']:.2f} ms -> {result['p95_ms']:.2f} ms"
+            )
+        if result["rps"] < previous["rps"] * (1 - threshold):
+            regressions.append(
+                f"{name}: throughput {previous['rps']:.1f} -> {result['rps']:.1f} req/s"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the HTTP routes")
+    parser.add_argument("--books", type=int, default=5000)
+    parser.add_argument("--news", type=int, default=5000)
+    parser.add_argument("--insights", type=int, default=2000)
+    parser.add_argument("--authors", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--login-requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--scenario", nargs="+")
+    parser.add_argument("--output", help="Write the results as a JSON baseline")
+    parser.add_argument("--compare", help="Baseline to check the results against")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    arguments = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="kennapartner-bench-")
+    process = None
+    try:
+        arguments.database, process = prepare_environment(directory)
+        results = asyncio.run(run(arguments))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "database": arguments.database,
+        "concurrency": arguments.concurrency,
+        "scenarios": results,
+    }
+    if arguments.output:
+        with open(arguments.output, "w") as output:
+            json.dump(report, output, indent=2)
+
+    failed = [name for name, result in results.items() if result["errors"]]
+    for name in failed:
+        print(
+            f"FAILED {name}: {results[name]['errors']} of "
+            f"{results[name]['requests']} requests failed",
+            file=sys.stderr,
+        )
+
+    regressions = []
+    if arguments.compare:
+        with open(arguments.compare) as baseline:
+            regressions = compare(results, json.load(baseline), arguments.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+    if failed or regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
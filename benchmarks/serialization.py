@@ -0,0 +1,97 @@
+from bson import ObjectId
+from datetime import datetime, timedelta, timezone
+from fastapi.responses import JSONResponse
+import argparse
+import os
+import sys
+import timeit
+
+
+"""
+Micro-benchmark of rendering one page of the book list.
+
+Compares the previous path, which validated every row into a `Book`,
+dumped it with `model_dump(mode="json")` and encoded the result with the
+stdlib `json` module, against validating rows into `BookSummary` and
+rendering the page with `FastJSONResponse` in a single pass. Rows are
+generated in the shape the aggregation returns them, so no database is
+needed. A `Book` cannot be validated before Beanie is initialised, so the
+previous path builds its documents with `model_construct`; its timings
+leave out that validation and are a lower bound.
+
+Usage:
+    python benchmarks/serialization.py [--limit 10 100] [--repeat 2000]
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_rows(count: int) -> list:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "_id": ObjectId(),
+            "name": f"Book {index}",
+            "introduction": "Introduction " * 40,
+            "preface": "Preface " * 40,
+            "foreword": "Foreword " * 40,
+            "author": "Author",
+            "date": now - timedelta(days=index),
+            "file_url": f"https://cdn.example.com/books/{index}.png",
+            "file_variants": {
+                "thumbnail": f"https://cdn.example.com/books/{index}-thumbnail.jpg",
+                "medium": f"https://cdn.example.com/books/{index}-medium.jpg",
+            },
+            "created_at": now,
+            "updated_at": now,
+        }
+        for index in range(count)
+    ]
+
+
+def make_renderers() -> tuple:
+    sys.path.insert(0, ROOT)
+    from src.kennapartner_backend.helpers import FastJSONResponse
+    from src.kennapartner_backend.modules import Book
+    from src.kennapartner_backend.modules.book.schema import BookSummary
+
+    def render_dump(rows: list) -> bytes:
+        books = [
+            Book.model_construct(
+                id=row["_id"], **{key: row[key] for key in row if key != "_id"}
+            )
+            for row in rows
+        ]
+        content = {"data": {"book": [book.model_dump(mode="json") for book in books]}}
+        return JSONResponse(content=content).body
+
+    def render_fast(rows: list) -> bytes:
+        books = [BookSummary.model_validate(row) for row in rows]
+        return FastJSONResponse(content={"data": {"book": books}}).body
+
+    return ("model_dump + json", render_dump), ("fast", render_fast)
+
+
+def run(limits: list, repeat: int):
+    renderers = make_renderers()
+    for limit in limits:
+        rows = make_rows(limit)
+        for name, render in renderers:
+            seconds = min(timeit.repeat(lambda: render(rows), number=repeat, repeat=5))
+            per_page = seconds / repeat * 1e6
+            size = len(render(rows))
+            print(f"limit={limit:<4} {name:<18} {per_page:9.1f} us/page", end=" ")
+            print(f"{size} bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark list page rendering")
+    parser.add_argument("--limit", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--repeat", type=int, default=2000)
+    arguments = parser.parse_args()
+
+    run(arguments.limit, arguments.repeat)
+
+
+if __name__ == "__main__":
+    main()
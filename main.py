@@ -1,9 +1,22 @@
 from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from src.kennapartner_backend import auth, book, news, insight
+from fastapi.staticfiles import StaticFiles
+from src.kennapartner_backend import auth, book, news, insight, jobs, lifespan
+from src.kennapartner_backend.services import get_storage
+from src.kennapartner_backend.helpers import FastJSONResponse
+from src.kennapartner_backend.services.storage import LocalStorage
+from src.kennapartner_backend.middleware import (
+    QueryStatsMiddleware,
+    QUERY_STATS_ENABLED,
+    MetricsMiddleware,
+    RequestContextMiddleware,
+    RequestTimingMiddleware,
+    ProfilingMiddleware,
+)
+from src.kennapartner_backend.utils.metrics import metrics_available, render_metrics
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -12,10 +25,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if QUERY_STATS_ENABLED:
+    app.add_middleware(QueryStatsMiddleware)
+
+if metrics_available():
+    app.add_middleware(MetricsMiddleware)
+
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(RequestTimingMiddleware)
+# Added last so it wraps the others and its latency covers them.
+app.add_middleware(RequestContextMiddleware)
+
 app.include_router(auth)
 app.include_router(book)
 app.include_router(news)
 app.include_router(insight)
+app.include_router(jobs)
+
+storage = get_storage()
+if isinstance(storage, LocalStorage) and storage.base_url.startswith("/"):
+    app.mount(storage.base_url, StaticFiles(directory=storage.root), name="media")
 
 
 @app.get("/", tags=["Health"])
@@ -24,3 +53,11 @@ def health_check():
         content={"message": "Backend Server is active"},
         status_code=200,
     )
+
+
+if metrics_available():
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        content, media_type = render_metrics()
+        return Response(content=content, media_type=media_type)
@@ -1,2 +1,3 @@
-from .modules import auth, book, news, insight
+from .modules import auth, book, news, insight, jobs
 from .utils import connect_to_database
+from .lifespan import lifespan
@@ -1,2 +1,7 @@
 from .jwt_verification import get_current_user
-from .file_validation import FileValidator
\ No newline at end of file
+from .file_validation import (
+    FileValidator,
+    ValidatedFile,
+    image_validator,
+    book_file_validator,
+)
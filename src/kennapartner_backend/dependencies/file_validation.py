@@ -1,38 +1,121 @@
 from fastapi import UploadFile, HTTPException
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, Optional
+import hashlib
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+IMAGE_TYPES = ("image/jpeg", "image/png", "image/webp")
+DOCUMENT_TYPES = ("application/pdf",)
+
+MAX_IMAGE_SIZE = int(os.getenv("UPLOAD_MAX_IMAGE_SIZE", 2 * 1024 * 1024))  # 2mb
+MAX_DOCUMENT_SIZE = int(os.getenv("UPLOAD_MAX_DOCUMENT_SIZE", 20 * 1024 * 1024))
+
+CHUNK_SIZE = 64 * 1024
+
+SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"%PDF-", "application/pdf"),
+)
+
+
+@dataclass
+class ValidatedFile:
+    file: BinaryIO
+    filename: Optional[str]
+    content_type: str
+    size: int
+    sha256: str
 
 
 """
-A class to validate uploaded files in a FastAPI application.
+A configurable dependency that validates uploaded files in a FastAPI
+application.
+
+The upload is read once, in chunks: the real type is sniffed from the
+magic bytes of the first chunk (the client-supplied content type is not
+trusted), reading stops as soon as the size limit for that type is crossed
+and a SHA-256 of the content is computed on the same pass. The spooled
+upload is then rewound and handed to the uploader as-is, without another
+in-memory copy.
 
 Attributes:
-    file (UploadFile): The uploaded file to be validated.
+    limits (Dict[str, int]): Accepted content types and the largest size,
+        in bytes, accepted for each.
 
-Methods:
-    check_file_type(): Validates the file type against allowed content types.
-    check_file_size(): Validates the file size against the allowed limit.
+Returns:
+    ValidatedFile: The rewound file with its sniffed type, size and hash.
 """
 class FileValidator:
-    def __init__(self, file: UploadFile):
-        self.file = file
-        self.check_file_type()
-        self.check_file_size()
-
-    def check_file_type(self):
-        allowed_content_type = ["image/jpeg", "image/png"]
-        if self.file.content_type not in allowed_content_type:
+    def __init__(self, limits: Optional[Dict[str, int]] = None):
+        self.limits = limits or dict.fromkeys(IMAGE_TYPES, MAX_IMAGE_SIZE)
+
+    async def __call__(self, file: UploadFile) -> ValidatedFile:
+        max_size = max(self.limits.values())
+        if file.size is not None and file.size > max_size:
+            self.reject_size(max_size)
+
+        await file.seek(0)
+        digest = hashlib.sha256()
+        content_type = None
+        size = 0
+
+        while chunk := await file.read(CHUNK_SIZE):
+            if content_type is None:
+                content_type = self.check_file_type(chunk)
+                max_size = self.limits[content_type]
+
+            size += len(chunk)
+            if size > max_size:
+                self.reject_size(max_size)
+            digest.update(chunk)
+
+        if content_type is None:
+            raise HTTPException(status_code=400, detail={"message": "File is empty"})
+
+        await file.seek(0)
+        return ValidatedFile(
+            file=file.file,
+            filename=file.filename,
+            content_type=content_type,
+            size=size,
+            sha256=digest.hexdigest(),
+        )
+
+    def check_file_type(self, head: bytes) -> str:
+        content_type = sniff_content_type(head)
+        if content_type not in self.limits:
             raise HTTPException(
                 status_code=400, detail={"message": "File type not allowed"}
             )
-        else:
-            return True
+        return content_type
 
-    def check_file_size(self):
-        allowed_file_size = 2 * 1024 * 1024  # 2mb
+    def reject_size(self, max_size: int):
+        limit = f"{max_size / (1024 * 1024):g}mb"
+        raise HTTPException(
+            status_code=400, detail={"message": f"File size excedeed {limit}"}
+        )
 
-        self.file.file.seek(0)
-        if len(self.file.file.read()) > allowed_file_size:
-            raise HTTPException(
-                status_code=400, detail={"message": "File size excedeed 2mb"}
-            )
-        else:
-            return True
+
+def sniff_content_type(head: bytes) -> Optional[str]:
+    for signature, content_type in SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+image_validator = FileValidator(dict.fromkeys(IMAGE_TYPES, MAX_IMAGE_SIZE))
+book_file_validator = FileValidator(
+    {
+        **dict.fromkeys(IMAGE_TYPES, MAX_IMAGE_SIZE),
+        **dict.fromkeys(DOCUMENT_TYPES, MAX_DOCUMENT_SIZE),
+    }
+)
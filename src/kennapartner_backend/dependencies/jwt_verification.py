@@ -5,6 +5,7 @@ from typing import Annotated
 from fastapi import Depends, HTTPException
 from ..utils import connect_to_database, logger
 from ..modules import User
+from ..helpers import token_cache
 import os
 from dotenv import load_dotenv
 
@@ -18,7 +19,8 @@ Retrieve the current user based on the provided JWT token.
 This asynchronous function decodes the JWT token to extract the user
 identifier and fetches the corresponding user from the database. It
 raises an HTTPException if the token is missing, invalid, expired, or
-if no user is found.
+if no user is found. Verified tokens are cached for a bounded time (see
+helpers.token_cache) so repeat requests skip the decode and user lookup.
 
 Parameters:
     token (Annotated[HTTPAuthorizationCredentials]): The JWT token
@@ -47,16 +49,22 @@ async def get_current_user(
             detail={"message": "Acess token required!"},
         )
 
+    user = token_cache.get(token.credentials)
+    if user is not None:
+        return user
+
     try:
         payload = jwt.decode(token.credentials, os.getenv("JWT_SECRET"), algorithms=["HS256"])
         user = await User.get(payload.get("sub"))
         if user is None:
             raise HTTPException(
+                status_code=401,
                 detail={
                     "message": "Account associated with this token does not exist",
                 },
             )
 
+        token_cache.set(token.credentials, user, payload.get("exp"))
         return user
     except InvalidTokenError as e:
         logger.error(e)
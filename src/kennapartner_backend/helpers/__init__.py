@@ -1 +1,23 @@
-from .token_generator import create_tokens
\ No newline at end of file
+from .token_generator import create_tokens
+from .pagination import (
+    paginate,
+    page_pipeline,
+    page_limit,
+    encode_cursor,
+    decode_cursor,
+)
+from .count import estimated_count, invalidate_count
+from .search import search_filter, search_collation, SearchMode, PREFIX_COLLATION
+from .password import verify_password, hash_password, needs_rehash
+from .token_cache import token_cache
+from .projection import Projection, select_fields
+from .json_response import FastJSONResponse
+from .bulk import (
+    BulkDeleteSchema,
+    BulkItems,
+    bulk_insert,
+    bulk_update,
+    bulk_delete,
+)
+from .export import export_response
+from .timed_route import TimedRoute
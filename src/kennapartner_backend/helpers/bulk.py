@@ -0,0 +1,289 @@
+from beanie import Document, PydanticObjectId
+from beanie.odm.utils.dump import get_dict
+from bson.errors import InvalidId
+from fastapi import HTTPException
+from pydantic import BaseModel, BeforeValidator, Field
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+from datetime import datetime, timezone
+from typing import (
+    Annotated,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+)
+import asyncio
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+"""
+Bulk create, update and delete shared by the resource routers.
+
+Each operation validates the whole batch up front, checks the uniqueness
+of the name/title field for every item with a single `$in` query and
+writes the remaining items with one unordered `bulk_write`, so one bad
+item never holds up the others. Every item gets its own result entry:
+
+    {"index": 0, "status": 201, "id": "..."}
+    {"index": 1, "status": 409, "message": "Book already exist"}
+
+Renames are checked against the names stored before the batch: an item
+cannot take a name held by another document, even one renamed by the
+same batch. The unique index would reject such a write anyway, since the
+two updates are applied one at a time, so swapping two names takes two
+batches through a temporary name.
+
+Deletes are issued as `find_one_and_delete` calls instead, at most
+BULK_DELETE_CONCURRENCY at a time, so that only the files of documents
+this request actually removed are returned for release. A `delete_many`
+reports how many documents it removed but not which, and two overlapping
+requests would then both release the files of the documents they shared.
+
+Request bodies are typed as `BulkItems[...]`, whose size is checked on
+the raw JSON array before any item is validated.
+
+Environment:
+    BULK_MAX_ITEMS             Largest batch accepted by a bulk endpoint
+                               (default: 1000).
+    BULK_DELETE_CONCURRENCY    Deletes of one batch in flight at a time
+                               (default: 16).
+"""
+
+MAX_BULK_ITEMS = int(os.getenv("BULK_MAX_ITEMS", 1000))
+BULK_DELETE_CONCURRENCY = int(os.getenv("BULK_DELETE_CONCURRENCY", 16))
+
+T = TypeVar("T")
+
+
+def check_bulk_size(items):
+    # Non-list input is left to the list validator to reject.
+    if not isinstance(items, list):
+        return items
+    if not items:
+        raise HTTPException(status_code=400, detail={"message": "No items given"})
+    if len(items) > MAX_BULK_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail={"message": f"At most {MAX_BULK_ITEMS} items are allowed"},
+        )
+    return items
+
+
+BulkItems = Annotated[
+    List[T],
+    Field(min_length=1, max_length=MAX_BULK_ITEMS),
+    BeforeValidator(check_bulk_size),
+]
+
+
+class BulkDeleteSchema(BaseModel):
+    ids: BulkItems[str]
+
+
+def item_result(index: int, status: int, id=None, message: Optional[str] = None):
+    result = {"index": index, "status": status}
+    if id is not None:
+        result["id"] = str(id)
+    if message is not None:
+        result["message"] = message
+    return result
+
+
+def parse_id(id: str) -> Optional[PydanticObjectId]:
+    try:
+        return PydanticObjectId(id)
+    except (InvalidId, TypeError):
+        return None
+
+
+async def write_unordered(
+    model: Type[Document], operations: list
+) -> Dict[int, dict]:
+    # Returns the write errors by operation index; duplicate keys raised by
+    # a concurrent writer after the uniqueness check surface here.
+    if not operations:
+        return {}
+    try:
+        await model.get_motor_collection().bulk_write(operations, ordered=False)
+    except BulkWriteError as error:
+        return {failure["index"]: failure for failure in error.details["writeErrors"]}
+    return {}
+
+
+def write_failure(failure: dict, label: str) -> Tuple[int, str]:
+    if failure.get("code") == 11000:
+        return 409, f"{label} already exist"
+    return 400, failure.get("errmsg", "Write failed")
+
+
+async def bulk_insert(
+    model: Type[Document],
+    documents: List[Document],
+    unique_field: str,
+    label: str,
+    prepare: Optional[Callable[[List[int]], Awaitable[None]]] = None,
+) -> List[dict]:
+    results: Dict[int, dict] = {}
+    values = [getattr(document, unique_field) for document in documents]
+    existing = {
+        row[unique_field]
+        async for row in model.get_motor_collection().find(
+            {unique_field: {"$in": values}}, {unique_field: 1}
+        )
+    }
+
+    now = datetime.now(timezone.utc)
+    seen = set()
+    indexes = []
+    for index, document in enumerate(documents):
+        value = getattr(document, unique_field)
+        if value in existing or value in seen:
+            results[index] = item_result(index, 409, message=f"{label} already exist")
+            continue
+        seen.add(value)
+
+        document.id = PydanticObjectId()
+        document.created_at = now
+        document.updated_at = now
+        indexes.append(index)
+
+    # Related documents are created only for the items that will be
+    # inserted, so rejected items leave nothing behind.
+    if prepare is not None and indexes:
+        await prepare(indexes)
+
+    operations = [
+        InsertOne(get_dict(documents[index], to_db=True)) for index in indexes
+    ]
+    failures = await write_unordered(model, operations)
+    for position, index in enumerate(indexes):
+        if position in failures:
+            status, message = write_failure(failures[position], label)
+            results[index] = item_result(index, status, message=message)
+        else:
+            results[index] = item_result(index, 201, id=documents[index].id)
+
+    return [results[index] for index in range(len(documents))]
+
+
+async def bulk_update(
+    model: Type[Document],
+    updates: List[Tuple[str, dict]],
+    unique_field: str,
+    label: str,
+) -> List[dict]:
+    results: Dict[int, dict] = {}
+    ids = [parse_id(id) for id, _ in updates]
+    values = [fields[unique_field] for _, fields in updates if unique_field in fields]
+
+    found, owners = set(), {}
+    async for row in model.get_motor_collection().find(
+        {
+            "$or": [
+                {"_id": {"$in": [id for id in ids if id is not None]}},
+                {unique_field: {"$in": values}},
+            ]
+        },
+        {unique_field: 1},
+    ):
+        found.add(row["_id"])
+        owners[row.get(unique_field)] = row["_id"]
+
+    now = datetime.now(timezone.utc)
+    claimed = {}
+    operations, indexes = [], []
+    for index, (id, (_, fields)) in enumerate(zip(ids, updates)):
+        if id is None:
+            results[index] = item_result(index, 400, message="Invalid id")
+            continue
+        if id not in found:
+            results[index] = item_result(
+                index, 404, id=id, message=f"{label} does not exist"
+            )
+            continue
+
+        # Checked against the stored names, see the module docstring.
+        value = fields.get(unique_field)
+        if unique_field in fields and (
+            owners.get(value, id) != id or claimed.get(value, id) != id
+        ):
+            results[index] = item_result(
+                index, 409, id=id, message=f"{label} already exist"
+            )
+            continue
+        if unique_field in fields:
+            claimed[value] = id
+
+        operations.append(
+            UpdateOne({"_id": id}, {"$set": {**fields, "updated_at": now}})
+        )
+        indexes.append(index)
+
+    failures = await write_unordered(model, operations)
+    for position, index in enumerate(indexes):
+        if position in failures:
+            status, message = write_failure(failures[position], label)
+            results[index] = item_result(
+                index, status, id=ids[index], message=message
+            )
+        else:
+            results[index] = item_result(index, 200, id=ids[index])
+
+    return [results[index] for index in range(len(updates))]
+
+
+async def bulk_delete(
+    model: Type[Document], ids: List[str], label: str
+) -> Tuple[List[dict], List[str]]:
+    results: Dict[int, dict] = {}
+    parsed = [parse_id(id) for id in ids]
+    unique = list(dict.fromkeys(id for id in parsed if id is not None))
+
+    # Each delete returns the document it removed; a concurrent request
+    # deleting the same document gets None and releases nothing.
+    collection = model.get_motor_collection()
+    limit = asyncio.Semaphore(BULK_DELETE_CONCURRENCY)
+
+    async def delete(id: PydanticObjectId) -> Optional[dict]:
+        async with limit:
+            return await collection.find_one_and_delete(
+                {"_id": id}, projection={"file_url": 1}
+            )
+
+    removed = dict(
+        zip(
+            unique,
+            await asyncio.gather(
+                *(delete(id) for id in unique), return_exceptions=True
+            ),
+        )
+    )
+
+    released, reported = [], set()
+    for index, id in enumerate(parsed):
+        row = removed.get(id)
+        if id is None:
+            results[index] = item_result(index, 400, message="Invalid id")
+        elif isinstance(row, PyMongoError):
+            status, message = write_failure({"errmsg": str(row)}, label)
+            results[index] = item_result(index, status, id=id, message=message)
+        elif isinstance(row, BaseException):
+            raise row
+        elif row is None or id in reported:
+            results[index] = item_result(
+                index, 404, id=id, message=f"{label} does not exist"
+            )
+        else:
+            reported.add(id)
+            results[index] = item_result(index, 200, id=id)
+            released.append(row.get("file_url"))
+
+    return [results[index] for index in range(len(ids))], released
@@ -0,0 +1,30 @@
+from ..utils.ttl_cache import TTLCache
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+"""
+Cached estimated document counts for unfiltered list totals.
+
+`estimated_document_count` reads collection metadata instead of scanning,
+and the result is kept for COUNT_CACHE_TTL seconds (default: 30). Routes
+that insert or delete documents call `invalidate_count` so the next list
+request picks up the change.
+"""
+
+count_cache = TTLCache(maxsize=64, ttl=float(os.getenv("COUNT_CACHE_TTL", 30)))
+
+
+async def estimated_count(model) -> int:
+    name = model.get_collection_name()
+    count = count_cache.get(name)
+    if count is None:
+        count = await model.get_motor_collection().estimated_document_count()
+        count_cache.set(name, count)
+    return count
+
+
+def invalidate_count(model):
+    count_cache.pop(model.get_collection_name())
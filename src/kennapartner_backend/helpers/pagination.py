@@ -0,0 +1,188 @@
+from beanie import PydanticObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+from pymongo import DESCENDING
+from datetime import datetime
+from dataclasses import dataclass
+from typing import Any, Optional
+import base64
+import binascii
+import json
+import os
+from dotenv import load_dotenv
+from .count import estimated_count
+
+load_dotenv()
+
+
+"""
+Offset and keyset (cursor) pagination shared by the list endpoints.
+
+Results are ordered by a per-resource sort key and `_id`, both descending.
+In cursor mode the opaque `next_cursor` returned with a page encodes the
+(sort key, _id) of its last item, so the next page is a range scan on the
+matching index instead of a skip over every preceding document.
+
+Filtered pages are returned together with their exact total from a single
+aggregation; unfiltered pages report a cached estimated total. Ranked
+(text search) pages are ordered by relevance score instead of the sort key.
+Given `fields`, the rows of the page are trimmed by a `$project` stage,
+and a `collation` is passed on to the aggregation (see search_collation).
+
+Environment:
+    PAGINATION_MAX_LIMIT    Largest `limit` a client may request (default: 100).
+"""
+
+MAX_PAGE_LIMIT = int(os.getenv("PAGINATION_MAX_LIMIT", 100))
+
+
+def page_limit(limit: int) -> int:
+    return min(limit, MAX_PAGE_LIMIT)
+
+
+def encode_cursor(value: Any, id: PydanticObjectId) -> str:
+    is_date = isinstance(value, datetime)
+    payload = {
+        "v": value.isoformat() if is_date else value,
+        "d": is_date,
+        "id": str(id),
+    }
+    encoded = base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8"))
+    return encoded.decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[Any, PydanticObjectId]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        value = payload["v"]
+        if payload["d"] and value is not None:
+            value = datetime.fromisoformat(value)
+        return value, PydanticObjectId(payload["id"])
+    except (binascii.Error, ValueError, KeyError, TypeError, InvalidId):
+        raise HTTPException(status_code=400, detail={"message": "Invalid cursor"})
+
+
+def cursor_filter(sort_field: str, cursor: str) -> dict:
+    value, id = decode_cursor(cursor)
+
+    # Missing values sort last in descending order, so they follow every
+    # non-null page and are themselves ordered by _id alone.
+    if value is None:
+        return {sort_field: None, "_id": {"$lt": id}}
+
+    return {
+        "$or": [
+            {sort_field: {"$lt": value}},
+            {sort_field: value, "_id": {"$lt": id}},
+            {sort_field: None},
+        ]
+    }
+
+
+@dataclass
+class Page:
+    items: list
+    next_cursor: Optional[str]
+    total: int
+    total_estimated: bool
+
+
+def page_pipeline(
+    match: dict,
+    sort_field: str,
+    query_params,
+    ranked: bool = False,
+    fields: Optional[dict] = None,
+) -> list:
+    limit = page_limit(query_params.limit)
+
+    # Text searches are ordered by relevance; the score is materialised so
+    # that it can serve as the cursor's sort key like any other field.
+    score = []
+    if ranked:
+        score = [{"$addFields": {"score": {"$meta": "textScore"}}}]
+    sort = {"$sort": {sort_field: DESCENDING, "_id": DESCENDING}}
+
+    seek = {"$skip": (query_params.page - 1) * limit}
+    if query_params.cursor:
+        seek = {"$match": cursor_filter(sort_field, query_params.cursor)}
+    window = {"$limit": limit + 1}
+
+    # The projection runs after the page is cut, so only the rows returned
+    # are trimmed; the sort key is kept until the cursor has been encoded.
+    project = []
+    if fields is not None:
+        project = [{"$project": {**fields, sort_field: 1}}]
+
+    if match:
+        # Filtered totals must be exact, so the page and its count come back
+        # from one $facet over the same match instead of a second query.
+        return [
+            {"$match": match},
+            *score,
+            sort,
+            {
+                "$facet": {
+                    "items": [seek, window, *project],
+                    "total": [{"$count": "count"}],
+                }
+            },
+        ]
+    if query_params.cursor:
+        return [seek, sort, window, *project]
+    return [sort, seek, window, *project]
+
+
+async def paginate(
+    model,
+    filter: list,
+    sort_field: str,
+    query_params,
+    ranked: bool = False,
+    projection=None,
+    fields: Optional[dict] = None,
+    collation: Optional[dict] = None,
+) -> Page:
+    limit = page_limit(query_params.limit)
+    match = model.find(*filter).get_filter_query()
+    if ranked:
+        sort_field = "score"
+    pipeline = page_pipeline(match, sort_field, query_params, ranked, fields)
+
+    collection = model.get_motor_collection()
+    if match:
+        result = (
+            await collection.aggregate(pipeline, collation=collation).to_list(
+                length=1
+            )
+        )[0]
+        documents = result["items"]
+        total = result["total"][0]["count"] if result["total"] else 0
+        total_estimated = False
+    else:
+        documents = await collection.aggregate(
+            pipeline, collation=collation
+        ).to_list(length=None)
+        total = await estimated_count(model)
+        total_estimated = True
+
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        last = documents[-1]
+        next_cursor = encode_cursor(last.get(sort_field), last["_id"])
+
+    if fields is not None and sort_field not in fields:
+        for document in documents:
+            document.pop(sort_field, None)
+
+    # Rows are validated straight into the response model when one is given,
+    # skipping the construction of full documents for list pages.
+    item_model = projection or model
+    return Page(
+        items=[item_model.model_validate(document) for document in documents],
+        next_cursor=next_cursor,
+        total=total,
+        total_estimated=total_estimated,
+    )
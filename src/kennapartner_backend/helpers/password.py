@@ -0,0 +1,90 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from fastapi import HTTPException
+import asyncio
+import bcrypt
+import os
+import time
+from dotenv import load_dotenv
+
+from ..utils.metrics import PASSWORD_VERIFY_DURATION
+from ..utils.timings import timed_phase
+
+load_dotenv()
+
+
+"""
+Password hashing and verification off the event loop.
+
+bcrypt is deliberately slow and releases the GIL while it works, so checks
+run on a dedicated thread pool instead of blocking every other request on
+the worker. Logins are admitted through a semaphore sized to that pool; a
+request that cannot get a slot within the queue timeout is rejected with
+503 rather than piling up behind a login storm.
+
+Environment:
+    BCRYPT_ROUNDS           Cost factor for new hashes (default: 12). Stored
+                            hashes with a different cost are rehashed on the
+                            next successful login.
+    LOGIN_MAX_CONCURRENCY   Password checks run at once (default: CPU count).
+    LOGIN_QUEUE_TIMEOUT     Seconds a login may wait for a slot (default: 2).
+"""
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+LOGIN_MAX_CONCURRENCY = int(os.getenv("LOGIN_MAX_CONCURRENCY", os.cpu_count() or 4))
+LOGIN_QUEUE_TIMEOUT = float(os.getenv("LOGIN_QUEUE_TIMEOUT", 2))
+
+_executor = ThreadPoolExecutor(
+    max_workers=LOGIN_MAX_CONCURRENCY, thread_name_prefix="bcrypt"
+)
+_slots = asyncio.Semaphore(LOGIN_MAX_CONCURRENCY)
+
+
+@asynccontextmanager
+async def login_slot():
+    try:
+        await asyncio.wait_for(_slots.acquire(), timeout=LOGIN_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=503,
+            detail={"message": "Too many login attempts, try again shortly"},
+            headers={"Retry-After": "1"},
+        )
+
+    try:
+        yield
+    finally:
+        _slots.release()
+
+
+async def verify_password(password: str, hashed: str) -> bool:
+    async with login_slot():
+        started = time.perf_counter()
+        try:
+            with timed_phase("password"):
+                return await asyncio.get_running_loop().run_in_executor(
+                    _executor,
+                    bcrypt.checkpw,
+                    password.encode("utf-8"),
+                    hashed.encode("utf-8"),
+                )
+        finally:
+            PASSWORD_VERIFY_DURATION.observe(time.perf_counter() - started)
+
+
+async def hash_password(password: str) -> str:
+    hashed = await asyncio.get_running_loop().run_in_executor(
+        _executor,
+        bcrypt.hashpw,
+        password.encode("utf-8"),
+        bcrypt.gensalt(rounds=BCRYPT_ROUNDS),
+    )
+    return hashed.decode("utf-8")
+
+
+def needs_rehash(hashed: str) -> bool:
+    # bcrypt hashes look like $2b$<cost>$<salt+hash>.
+    try:
+        return int(hashed.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
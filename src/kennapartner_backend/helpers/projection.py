@@ -0,0 +1,62 @@
+from fastapi import HTTPException
+from pydantic import BaseModel, ConfigDict, Field, model_serializer
+from typing import Dict, Iterable, Optional, Tuple, Type
+
+
+"""
+Sparse fieldsets for list endpoints.
+
+`select_fields` turns the `fields=` query parameter, or a resource's
+default summary fields, into a `$project` stage, so unselected fields are
+never read from the collection. With `summary_length=` an `excerpt` of the
+resource's long text field is cut in the database with `$substrCP`.
+
+List rows are validated into a `Projection` model, which renders only the
+fields that were read and replaces the map of image variants with the URL
+of its thumbnail.
+"""
+class Projection(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    file_variants: Optional[Dict[str, str]] = Field(default=None, exclude=True)
+    excerpt: Optional[str] = None
+
+    @model_serializer(mode="wrap")
+    def selected_fields(self, handler) -> dict:
+        data = handler(self)
+        selected = {
+            name: value for name, value in data.items() if name in self.model_fields_set
+        }
+        if "excerpt" in selected:
+            selected["excerpt"] = selected.pop("excerpt")
+        if "file_variants" in self.model_fields_set:
+            selected["thumbnail_url"] = (self.file_variants or {}).get("thumbnail")
+        return selected
+
+
+def select_fields(
+    projection: Type[Projection],
+    fields: Optional[str],
+    default: Iterable[str],
+    excerpt: Tuple[str, Optional[int]] = (None, None),
+) -> dict:
+    # Blank selections such as `fields=,` fall back to the defaults.
+    names = [name.strip() for name in (fields or "").split(",") if name.strip()]
+    names = names or default
+
+    stage = {}
+    for name in names:
+        if name == "thumbnail_url":
+            name = "file_variants"
+        if name == "id":
+            continue
+        if name not in projection.model_fields or name == "excerpt":
+            raise HTTPException(
+                status_code=400, detail={"message": f"Unknown field {name}"}
+            )
+        stage[name] = 1
+
+    source, length = excerpt
+    if source and length:
+        stage["excerpt"] = {"$substrCP": [{"$ifNull": [f"${source}", ""]}, 0, length]}
+    return stage
@@ -0,0 +1,41 @@
+from typing import Literal, Optional
+
+
+"""
+Search filters for the list endpoints.
+
+Two modes are supported, both of which can be served from an index:
+
+    text    Full-text search against the collection's text index. Results
+            are ranked by relevance; quotes and negations in the input are
+            treated as plain words.
+    prefix  Case-insensitive match at the start of the resource's
+            name/title. It is a range on a collated index, so it must run
+            with `search_collation()`: U+FFFF is the highest character in
+            the collation, so the range covers every name that starts with
+            the query.
+"""
+
+SearchMode = Literal["text", "prefix"]
+
+# Collation of the name/title prefix indexes; strength 2 compares letters
+# without their case.
+PREFIX_COLLATION = {"locale": "en", "strength": 2}
+
+
+def text_search_terms(query: str) -> str:
+    terms = query.replace('"', " ").split()
+    return " ".join(term.lstrip("-") for term in terms if term.lstrip("-"))
+
+
+def search_filter(mode: SearchMode, query: str, prefix_field: str) -> dict:
+    if mode == "prefix":
+        return {prefix_field: {"$gte": query, "$lt": query + "\uffff"}}
+    return {"$text": {"$search": text_search_terms(query)}}
+
+
+def search_collation(mode: SearchMode, query: Optional[str]) -> Optional[dict]:
+    # $text does not accept a collation, so only prefix searches get one.
+    if query and mode == "prefix":
+        return PREFIX_COLLATION
+    return None
@@ -0,0 +1,36 @@
+from fastapi.routing import APIRoute
+from typing import Callable
+import functools
+import inspect
+from ..utils.timings import mark_endpoint_started
+
+
+"""
+Route class that marks when the endpoint itself starts running.
+
+Everything between the start of the request and that mark is request
+parsing and dependency resolution, which the slow request log reports as
+its own phase. Only coroutine endpoints are wrapped; sync endpoints run
+on the thread pool and are left as they are.
+
+`include_router` builds every route again from the endpoint of the route
+it copies, which is already wrapped; such endpoints are recognised by
+their marker and kept as they are.
+"""
+class TimedRoute(APIRoute):
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        if inspect.iscoroutinefunction(endpoint) and not getattr(
+            endpoint, "__timed_endpoint__", False
+        ):
+            endpoint = timed_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def timed_endpoint(endpoint: Callable) -> Callable:
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        mark_endpoint_started()
+        return await endpoint(*args, **kwargs)
+
+    wrapper.__timed_endpoint__ = True
+    return wrapper
@@ -0,0 +1,84 @@
+from ..utils.ttl_cache import TTLCache
+from ..utils.metrics import TOKEN_CACHE_LOOKUPS
+from typing import Any, Optional
+import hashlib
+import time
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+"""
+A bounded cache of verified access tokens and the users they resolve to.
+
+Entries live for TOKEN_CACHE_TTL seconds (default: 60) or until the token
+expires, whichever is sooner, so a deleted or changed user stops being
+accepted by every worker within that window. Within the worker that made
+the change the user model invalidates its tokens immediately.
+
+Tokens are keyed by their SHA-256 digest so the cache never holds bearer
+credentials.
+
+Attributes:
+    hits (int): Lookups answered from the cache.
+    misses (int): Lookups that needed a database read.
+
+Methods:
+    get(token): Return the cached user for a token, or None.
+    set(token, user, expires_at): Cache a user until `expires_at` (a UNIX
+        timestamp, usually the token's `exp` claim) or the TTL.
+    invalidate_user(user_id): Drop every cached token of a user.
+    stats(): Return hit/miss counters and the current size.
+"""
+class TokenCache:
+    def __init__(self, maxsize: int = 10000, ttl: float = 60):
+        self.ttl = ttl
+        self.entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.tokens_by_user: dict[str, set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[Any]:
+        user = self.entries.get(token_key(token))
+        if user is None:
+            self.misses += 1
+            TOKEN_CACHE_LOOKUPS.labels("miss").inc()
+        else:
+            self.hits += 1
+            TOKEN_CACHE_LOOKUPS.labels("hit").inc()
+        return user
+
+    def set(self, token: str, user: Any, expires_at: Optional[float] = None):
+        ttl = self.ttl
+        if expires_at is not None:
+            ttl = min(ttl, expires_at - time.time())
+        if ttl <= 0:
+            return
+
+        key = token_key(token)
+        self.entries.set(key, user, ttl)
+
+        # Forget keys that have since expired or been evicted so the index
+        # stays proportional to the cache itself.
+        user_id = str(user.id)
+        keys = {k for k in self.tokens_by_user.get(user_id, ()) if k in self.entries}
+        keys.add(key)
+        self.tokens_by_user[user_id] = keys
+
+    def invalidate_user(self, user_id: str):
+        for key in self.tokens_by_user.pop(str(user_id), ()):
+            self.entries.pop(key)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.entries)}
+
+
+def token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+token_cache = TokenCache(
+    maxsize=int(os.getenv("TOKEN_CACHE_SIZE", 10000)),
+    ttl=float(os.getenv("TOKEN_CACHE_TTL", 60)),
+)
@@ -0,0 +1,32 @@
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
+from .utils import init_database, close_database
+from .utils.metrics import close_metrics
+from .services import (
+    close_storage,
+    close_variant_pool,
+    response_cache,
+    start_upload_workers,
+    stop_upload_workers,
+)
+
+
+"""
+Application lifespan: open shared resources on startup and release them
+on shutdown.
+"""
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_database()
+    start_upload_workers()
+    try:
+        yield
+    finally:
+        await stop_upload_workers()
+        close_variant_pool()
+        await close_storage()
+        await response_cache.backend.close()
+        await close_database()
+        close_metrics()
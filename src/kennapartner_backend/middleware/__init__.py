@@ -0,0 +1,5 @@
+from .query_stats import QueryStatsMiddleware, QUERY_STATS_ENABLED
+from .metrics import MetricsMiddleware
+from .request_log import RequestContextMiddleware
+from .timing import RequestTimingMiddleware
+from .profiling import ProfilingMiddleware
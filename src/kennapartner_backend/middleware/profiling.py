@@ -0,0 +1,98 @@
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..dependencies import get_current_user
+from ..utils import logger
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+try:
+    from pyinstrument import Profiler
+except ImportError:
+    Profiler = None
+
+
+"""
+On-demand profiling of a single request.
+
+An authenticated request carrying an `X-Profile` header is run under the
+pyinstrument sampling profiler, and the report is returned instead of
+the normal response; the status the endpoint produced is kept in the
+`X-Profiled-Status` header. `X-Profile: text` returns a plain text call
+tree and any other value an HTML report. Requests without a valid access
+token, or when the optional `pyinstrument` package is not installed, are
+handled normally.
+
+Environment:
+    PROFILE_INTERVAL    Sampling interval in seconds (default: 0.001).
+"""
+
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", 0.001))
+HEADER = b"x-profile"
+
+
+async def is_authorized(headers: dict) -> bool:
+    scheme, _, credentials = headers.get(b"authorization", b"").decode().partition(" ")
+    if scheme.lower() != "bearer" or not credentials:
+        return False
+    try:
+        await get_current_user(
+            HTTPAuthorizationCredentials(scheme=scheme, credentials=credentials), None
+        )
+    except HTTPException:
+        return False
+    return True
+
+
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        headers = dict(scope.get("headers", ()))
+        if scope["type"] != "http" or HEADER not in headers:
+            await self.app(scope, receive, send)
+            return
+        if Profiler is None:
+            logger.warning("Profiling was requested but pyinstrument is not installed")
+            await self.app(scope, receive, send)
+            return
+        if not await is_authorized(headers):
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        profiler = Profiler(interval=PROFILE_INTERVAL, async_mode="enabled")
+
+        async def discard(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        profiler.start()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            profiler.stop()
+
+        if headers[HEADER].strip().lower() == b"text":
+            body = profiler.output_text(unicode=True).encode("utf-8")
+            content_type = b"text/plain; charset=utf-8"
+        else:
+            body = profiler.output_html().encode("utf-8")
+            content_type = b"text/html; charset=utf-8"
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", content_type),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                    (b"x-profiled-status", str(status).encode("latin-1")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,53 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..utils import record_queries, recorder
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+"""
+Development aid that records the database commands of every request.
+
+Totals are kept per route template on `recorder.routes`, and each response
+carries an `X-DB-Stats` header with the number of commands issued and
+the time spent in them before the response started, e.g.
+`commands=3; time=4.21ms`. Commands issued while a streaming body is sent
+are only counted in the route totals.
+
+Environment:
+    QUERY_STATS    "true" to install the middleware (default: off).
+"""
+
+QUERY_STATS_ENABLED = os.getenv("QUERY_STATS") == "true"
+HEADER = b"x-db-stats"
+
+
+class QueryStatsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with record_queries() as stats:
+
+            async def send_with_stats(message: Message):
+                if message["type"] == "http.response.start":
+                    time = stats.duration * 1000
+                    value = f"commands={stats.count}; time={time:.2f}ms"
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (HEADER, value.encode("latin-1")),
+                    ]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_stats)
+            finally:
+                # The router stores the matched route on the scope.
+                route = scope.get("route")
+                path = route.path if route is not None else scope["path"]
+                recorder.add_route(f"{scope['method']} {path}", stats)
@@ -0,0 +1,61 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..utils import logger
+from ..utils.logger import request_scope
+import time
+import uuid
+
+
+"""
+Request context for the logger and one access record per request.
+
+The request id is taken from an incoming `X-Request-ID` header or
+generated, echoed on the response and attached to every record logged
+while the request is handled. The access record carries the method,
+status and latency; server errors are logged as warnings so sampling
+never drops them.
+"""
+
+HEADER = b"x-request-id"
+MAX_REQUEST_ID_LENGTH = 128
+
+
+class RequestContextMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = dict(scope["headers"]).get(HEADER, b"").decode("latin-1")
+        request_id = incoming[:MAX_REQUEST_ID_LENGTH] or uuid.uuid4().hex
+        scope["request_id"] = request_id
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_id(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (HEADER, request_id.encode("latin-1")),
+                ]
+            await send(message)
+
+        token = request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            latency = round((time.perf_counter() - started) * 1000, 2)
+            log = logger.warning if status >= 500 else logger.info
+            log(
+                f"{scope['method']} {scope['path']} {status}",
+                extra={
+                    "method": scope["method"],
+                    "status": status,
+                    "latency_ms": latency,
+                },
+            )
+            request_scope.reset(token)
@@ -0,0 +1,86 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..utils import logger, record_queries
+from ..utils.timings import RequestTimings, current_timings
+import time
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+"""
+Slow request log.
+
+Every request is timed, and one that takes longer than the threshold is
+logged as a warning with a breakdown of where its time went:
+
+    dependencies_ms    Request parsing and dependency resolution, up to
+                       the start of the endpoint.
+    endpoint_ms        From the start of the endpoint to the response.
+    db_ms, db_commands Database round trips over the whole request.
+    serialization_ms   Rendering JSON responses.
+    upload_ms          Transfers to file storage.
+    variants_ms        Rendering and storing image variants.
+    password_ms        bcrypt checks.
+
+Phases overlap (database time is also part of the dependencies and the
+endpoint), so they do not add up to the total.
+
+Environment:
+    SLOW_REQUEST_THRESHOLD_MS    Requests slower than this are logged
+                                 (default: 1000).
+"""
+
+SLOW_REQUEST_THRESHOLD = float(os.getenv("SLOW_REQUEST_THRESHOLD_MS", 1000)) / 1000
+
+
+def milliseconds(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+class RequestTimingMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        response_started = None
+
+        async def send_with_timing(message: Message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = time.perf_counter()
+            await send(message)
+
+        token = current_timings.set(timings)
+        try:
+            with record_queries() as stats:
+                await self.app(scope, receive, send_with_timing)
+        finally:
+            current_timings.reset(token)
+            finished = time.perf_counter()
+            if finished - timings.started >= SLOW_REQUEST_THRESHOLD:
+                breakdown = {
+                    f"{phase}_ms": milliseconds(seconds)
+                    for phase, seconds in timings.phases.items()
+                }
+                if timings.endpoint_started is not None:
+                    breakdown["dependencies_ms"] = milliseconds(
+                        timings.endpoint_started - timings.started
+                    )
+                    breakdown["endpoint_ms"] = milliseconds(
+                        (response_started or finished) - timings.endpoint_started
+                    )
+                logger.warning(
+                    f"Slow request {scope['method']} {scope['path']}",
+                    extra={
+                        "total_ms": milliseconds(finished - timings.started),
+                        "db_ms": milliseconds(stats.duration),
+                        "db_commands": stats.count,
+                        "phases": breakdown,
+                    },
+                )
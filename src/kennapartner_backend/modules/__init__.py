@@ -1,4 +1,5 @@
 from .authentication import auth, User
 from .book import Book, book
 from .news import news, News
-from .insight import insight, Insight, InsightAuthor
\ No newline at end of file
+from .insight import insight, Insight, InsightAuthor
+from .job import jobs
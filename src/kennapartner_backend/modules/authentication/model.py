@@ -1,6 +1,18 @@
-from beanie import Document, Indexed, before_event, Insert, Replace, Save
+from beanie import (
+    Document,
+    Indexed,
+    before_event,
+    after_event,
+    Insert,
+    Replace,
+    Save,
+    SaveChanges,
+    Update,
+    Delete,
+)
 from typing import Annotated
 from datetime import datetime, timezone
+from ...helpers import token_cache
 
 
 class User(Document):
@@ -20,3 +32,7 @@ class User(Document):
     @before_event(Replace, Save)
     def set_updatd_at(self):
         self.updated_at = datetime.now(timezone.utc)
+
+    @after_event(Replace, Save, SaveChanges, Update, Delete)
+    def invalidate_tokens(self):
+        token_cache.invalidate_user(str(self.id))
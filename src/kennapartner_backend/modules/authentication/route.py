@@ -4,11 +4,18 @@ from typing import Annotated
 from motor.motor_asyncio import AsyncIOMotorClient
 from ...utils import connect_to_database
 from .model import User
-from ...helpers import create_tokens
+from ...helpers import (
+    create_tokens,
+    verify_password,
+    hash_password,
+    needs_rehash,
+    TimedRoute,
+)
 from .schema import LoginSchema
-import bcrypt
 
-auth = APIRouter(prefix="/api/v1/auth", tags=["Authentication"])
+auth = APIRouter(
+    prefix="/api/v1/auth", tags=["Authentication"], route_class=TimedRoute
+)
 
 
 @auth.post("/login")
@@ -23,13 +30,13 @@ async def login(
             detail={"message": "Account does not exist"},
         )
 
-    compare_password = bcrypt.checkpw(
-        validated_request.password.encode("utf-8"),
-        user.model_dump(mode="json").get("password").encode("utf-8"),
-    )
+    compare_password = await verify_password(validated_request.password, user.password)
     if not compare_password:
         raise HTTPException(status_code=401, detail={"message": "Invalid credentials"})
 
+    if needs_rehash(user.password):
+        await user.set({User.password: await hash_password(validated_request.password)})
+
     access_token, refresh_token = create_tokens(user.model_dump(mode="json").get("id"))
     return JSONResponse(
         content={
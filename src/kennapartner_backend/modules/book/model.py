@@ -1,6 +1,8 @@
 from beanie import Document, Insert, Replace, Save, before_event
 from datetime import datetime, timezone
-from typing import Optional
+from pymongo import IndexModel, ASCENDING, DESCENDING, TEXT
+from typing import Dict, Optional
+from ...helpers import PREFIX_COLLATION
 
 
 class Book(Document):
@@ -11,11 +13,28 @@ class Book(Document):
     author: str
     date: datetime
     file_url: Optional[str] = None
+    file_variants: Dict[str, str] = {}
     created_at: datetime = None
     updated_at: datetime = None
 
     class Settings:
         name = "books"
+        indexes = [
+            IndexModel([("name", ASCENDING)], name="name_unique", unique=True),
+            IndexModel(
+                [("name", ASCENDING)],
+                name="name_prefix",
+                collation=PREFIX_COLLATION,
+            ),
+            IndexModel(
+                [("date", DESCENDING), ("_id", DESCENDING)], name="date_sort"
+            ),
+            IndexModel(
+                [("name", TEXT), ("author", TEXT), ("introduction", TEXT)],
+                weights={"name": 10, "author": 5, "introduction": 1},
+                name="book_text",
+            ),
+        ]
 
     @before_event(Insert)
     def set_created_at(self):
@@ -1,18 +1,62 @@
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, UploadFile
-from .schema import BookSchema, QueryParamsSchema
-from fastapi.responses import JSONResponse
-from beanie.operators import RegEx
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request
+from .schema import (
+    BookSchema,
+    BookPatchSchema,
+    QueryParamsSchema,
+    ExportParamsSchema,
+    BookSummary,
+    SUMMARY_FIELDS,
+    EXPORT_FIELDS,
+)
 from fastapi.security import HTTPAuthorizationCredentials
-from ...dependencies import get_current_user, FileValidator
-from typing import Annotated
+from ...dependencies import get_current_user, ValidatedFile, book_file_validator
+from typing import Annotated, Literal
 from .model import Book
 from motor.motor_asyncio import AsyncIOMotorClient
 from ...utils import connect_to_database
-from ...services import upload_file_to_cloudinary
-from datetime import datetime
+from ...services import (
+    replace_file,
+    delete_and_release,
+    release_files,
+    response_cache,
+    enqueue_upload,
+)
+from ...services.cache import last_modified
+from ...helpers import (
+    paginate,
+    page_limit,
+    invalidate_count,
+    search_filter,
+    search_collation,
+    select_fields,
+    FastJSONResponse,
+    BulkDeleteSchema,
+    BulkItems,
+    bulk_insert,
+    bulk_update,
+    bulk_delete,
+    export_response,
+    TimedRoute,
+)
+from pymongo.errors import DuplicateKeyError
+from datetime import datetime, timezone
 
 
-book = APIRouter(prefix="/api/v1/books", tags=["Book"])
+book = APIRouter(prefix="/api/v1/books", tags=["Book"], route_class=TimedRoute)
+
+
+def list_filter(query_params) -> list:
+    filter = []
+    if query_params.year:
+        start = datetime(int(query_params.year), 1, 1)
+        end = datetime(int(query_params.year) + 1, 1, 1)
+
+        filter.append(Book.date >= start)
+        filter.append(Book.date < end)
+
+    if query_params.query:
+        filter.append(search_filter(query_params.search, query_params.query, "name"))
+    return filter
 
 
 @book.post("/")
@@ -21,15 +65,63 @@ async def create_book(
     current_user: Annotated[HTTPAuthorizationCredentials, Depends(get_current_user)],
     validated_request: BookSchema,
 ):
-    book = await Book.find_one(Book.name == validated_request.name)
-    if book:
+    book = Book(**validated_request.model_dump(mode="json"))
+    try:
+        await book.insert()
+    except DuplicateKeyError:
         raise HTTPException(status_code=409, detail={"message": "Book already exist"})
+    invalidate_count(Book)
+    await response_cache.invalidate("books")
+    return FastJSONResponse(content={"data": {"book": book}}, status_code=201)
 
-    book = Book(**validated_request.model_dump(mode="json"))
-    await book.insert()
-    return JSONResponse(
-        content={"data": {"book": book.model_dump(mode="json")}}, status_code=201
+
+@book.post("/bulk")
+async def bulk_create_book(
+    init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
+    current_user: Annotated[HTTPAuthorizationCredentials, Depends(get_current_user)],
+    validated_request: BulkItems[BookSchema],
+):
+    results = await bulk_insert(
+        Book,
+        [Book(**item.model_dump()) for item in validated_request],
+        "name",
+        "Book",
     )
+    invalidate_count(Book)
+    await response_cache.invalidate("books")
+    return FastJSONResponse(content={"data": {"results": results}}, status_code=200)
+
+
+@book.patch("/bulk")
+async def bulk_update_book(
+    init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
+    current_user: Annotated[HTTPAuthorizationCredentials, Depends(get_current_user)],
+    validated_request: BulkItems[BookPatchSchema],
+):
+    results = await bulk_update(
+        Book,
+        [
+            (item.id, item.model_dump(exclude={"id"}, exclude_none=True))
+            for item in validated_request
+        ],
+        "name",
+        "Book",
+    )
+    await response_cache.invalidate("books")
+    return FastJSONResponse(content={"data": {"results": results}}, status_code=200)
+
+
+@book.delete("/bulk")
+async def bulk_delete_book(
+    init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
+    current_user: Annotated[HTTPAuthorizationCredentials, Depends(get_current_user)],
+    validated_request: BulkDeleteSchema,
+):
+    results, file_urls = await bulk_delete(Book, validated_request.ids, "Book")
+    await release_files(file_urls)
+    invalidate_count(Book)
+    await response_cache.invalidate("books")
+    return FastJSONResponse(content={"data": {"results": results}}, status_code=200)
 
 
 @book.patch("/{id}/upload")
@@ -37,69 +129,116 @@ async def upload_file(
     init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
     current_user: Annotated[HTTPAuthorizationCredentials, Depends(get_current_user)],
     id: Annotated[str, Path()],
-    file: UploadFile,
-    validate_file: Annotated[bool, Depends(FileValidator)],
+    file: Annotated[ValidatedFile, Depends(book_file_validator)],
+    mode: Annotated[Literal["sync", "async"], Query()] = "sync",
 ):
     book = await Book.get(id)
     if book is None:
         raise HTTPException(status_code=404, detail={"message": "Book does not exist"})
 
-    uploaded_file = upload_file_to_cloudinary(file)
+    if mode == "async":
+        job = await enqueue_upload("books", book.id, file)
+        return FastJSONResponse(
+            content={"data": {"job": job.public_dump()}},
+            status_code=202,
+            headers={"Location": f"/api/v1/jobs/{job.id}"},
+        )
 
-    await book.set({Book.file_url: uploaded_file})
-    return JSONResponse(
-        content={"data": {"book": book.model_dump(mode="json")}}, status_code=200
-    )
+    if await replace_file(book, file) is None:
+        raise HTTPException(status_code=404, detail={"message": "Book does not exist"})
+    await response_cache.invalidate("books")
+    return FastJSONResponse(content={"data": {"book": book}}, status_code=200)
 
 
 @book.get("/")
 async def list_book(
+    request: Request,
     init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
     query_params: Annotated[QueryParamsSchema, Query()],
 ):
-    filter = []
-    if query_params.year:
-        start = datetime(int(query_params.year), 1, 1)
-        end = datetime(int(query_params.year) + 1, 1, 1)
-
-        filter.append(Book.date >= start)
-        filter.append(Book.date < end)
-
-    if query_params.query:
-        filter.append(RegEx(Book.name, query_params.query, options="i"))
+    cached = await response_cache.lookup(request, "books")
+    if cached:
+        return cached
 
-    books = (
-        await Book.find(*filter)
-        .skip((query_params.page - 1) * query_params.limit)
-        .limit(10)
-        .to_list()
+    filter = list_filter(query_params)
+    ranked = bool(query_params.query) and query_params.search == "text"
+    fields = select_fields(
+        BookSummary,
+        query_params.fields,
+        SUMMARY_FIELDS,
+        excerpt=("introduction", query_params.summary_length),
+    )
+    page = await paginate(
+        Book,
+        filter,
+        "date",
+        query_params,
+        ranked=ranked,
+        projection=BookSummary,
+        fields=fields,
+        collation=search_collation(query_params.search, query_params.query),
     )
 
-    total_books = await Book.count()
-    return JSONResponse(
-        content={
+    return await response_cache.respond(
+        request,
+        "books",
+        {
             "data": {
-                "book": [book.model_dump(mode="json") for book in books],
+                "book": page.items,
                 "page": query_params.page,
-                "limit": query_params.limit,
-                "total_books": total_books,
+                "limit": page_limit(query_params.limit),
+                "next_cursor": page.next_cursor,
+                "total_books": page.total,
+                "total_estimated": page.total_estimated,
             }
         },
-        status_code=200,
+        last_modified=last_modified(page.items),
+    )
+
+
+@book.get("/export")
+async def export_book(
+    init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
+    current_user: Annotated[HTTPAuthorizationCredentials, Depends(get_current_user)],
+    query_params: Annotated[ExportParamsSchema, Query()],
+):
+    fields = select_fields(
+        BookSummary,
+        query_params.fields,
+        EXPORT_FIELDS,
+        excerpt=("introduction", query_params.summary_length),
+    )
+    return export_response(
+        Book,
+        list_filter(query_params),
+        "date",
+        BookSummary,
+        fields,
+        query_params.format,
+        "books",
+        collation=search_collation(query_params.search, query_params.query),
     )
 
 
 @book.get("/{id}")
 async def get_book(
+    request: Request,
     init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
     id: Annotated[str, Path()],
 ):
+    cached = await response_cache.lookup(request, "books")
+    if cached:
+        return cached
+
     book = await Book.get(id)
     if book is None:
         raise HTTPException(status_code=404, detail={"message": "Book does not exist"})
 
-    return JSONResponse(
-        content={"data": {"book": book.model_dump(mode="json")}}, status_code=200
+    return await response_cache.respond(
+        request,
+        "books",
+        {"data": {"book": book}},
+        last_modified=book.updated_at,
     )
 
 
@@ -114,10 +253,17 @@ async def update_book(
     if book is None:
         raise HTTPException(status_code=404, detail={"message": "Book does not exist"})
 
-    await book.set({**validated_request.model_dump(mode="json")})
-    return JSONResponse(
-        content={"data": {"book": book.model_dump(mode="json")}}, status_code=200
-    )
+    try:
+        await book.set(
+            {
+                **validated_request.model_dump(mode="json"),
+                Book.updated_at: datetime.now(timezone.utc),
+            }
+        )
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail={"message": "Book already exist"})
+    await response_cache.invalidate("books")
+    return FastJSONResponse(content={"data": {"book": book}}, status_code=200)
 
 
 @book.delete("/{id}")
@@ -130,5 +276,8 @@ async def delete_book(
     if book is None:
         raise HTTPException(status_code=404, detail={"message": "Book does not exist"})
 
-    await book.delete()
-    return JSONResponse(content={"message": "Book deleted"}, status_code=200)
+    if not await delete_and_release(book):
+        raise HTTPException(status_code=404, detail={"message": "Book does not exist"})
+    invalidate_count(Book)
+    await response_cache.invalidate("books")
+    return FastJSONResponse(content={"message": "Book deleted"}, status_code=200)
@@ -0,0 +1,85 @@
+from beanie.operators import In
+from pymongo import UpdateOne
+from datetime import datetime, timezone
+from typing import List, Optional
+from motor.motor_asyncio import AsyncIOMotorClientSession
+from .model import InsightAuthor
+from .schema import Author
+
+
+"""
+Resolve insight authors by email in a constant number of round trips.
+
+Existing authors are loaded with a single `$in` query and the missing ones
+are created with one unordered bulk upsert keyed on email, so concurrent
+requests naming the same new author converge on a single document.
+
+Parameters:
+    authors (List[Author]): Authors from the request; duplicates by email
+        are collapsed.
+    session (AsyncIOMotorClientSession): Optional transaction session.
+
+Returns:
+    List[InsightAuthor]: One author document per distinct email, in the
+        order they were first given.
+"""
+
+
+async def resolve_authors(
+    authors: List[Author], session: Optional[AsyncIOMotorClientSession] = None
+) -> List[InsightAuthor]:
+    requested = {}
+    for author in authors:
+        requested.setdefault(author.email, author)
+
+    resolved = {
+        author.email: author
+        for author in await InsightAuthor.find(
+            In(InsightAuthor.email, list(requested)), session=session
+        ).to_list()
+    }
+
+    missing = [author for email, author in requested.items() if email not in resolved]
+    if missing:
+        now = datetime.now(timezone.utc)
+        result = await InsightAuthor.get_motor_collection().bulk_write(
+            [
+                UpdateOne(
+                    {"email": author.email},
+                    {
+                        "$setOnInsert": {
+                            **author.model_dump(mode="json"),
+                            "file_url": None,
+                            "file_variants": {},
+                            "created_at": now,
+                            "updated_at": now,
+                        }
+                    },
+                    upsert=True,
+                )
+                for author in missing
+            ],
+            ordered=False,
+            session=session,
+        )
+        for index, id in result.upserted_ids.items():
+            author = InsightAuthor(
+                id=id,
+                **missing[index].model_dump(mode="json"),
+                created_at=now,
+                updated_at=now,
+            )
+            resolved[author.email] = author
+
+        # Authors created by a concurrent request matched the upsert filter
+        # instead of being inserted, so they still need to be read back.
+        unresolved = [
+            author.email for author in missing if author.email not in resolved
+        ]
+        if unresolved:
+            for author in await InsightAuthor.find(
+                In(InsightAuthor.email, unresolved), session=session
+            ).to_list():
+                resolved[author.email] = author
+
+    return [resolved[email] for email in requested]
@@ -0,0 +1,80 @@
+from beanie import Link, PydanticObjectId
+from beanie.operators import In
+from typing import Dict, Iterable, List, Union
+from .model import Insight, InsightAuthor
+from .schema import AuthorSummary, InsightDetail, InsightSummary
+
+
+"""
+A request-scoped loader for the authors linked from insights.
+
+Instead of resolving `Insight.authors` per document with `fetch_links`,
+every author id referenced by the insights being returned is collected and
+fetched with a single `$in` query. Loaded authors are kept in an identity
+map, so an author shared by several insights is fetched and serialised
+once per request.
+
+Attributes:
+    authors (Dict[PydanticObjectId, InsightAuthor]): Authors loaded so far.
+
+Methods:
+    load(insights): Fetch every author referenced by the insights that has
+        not been loaded yet.
+    serialize(insight, expand, summary): Build the response model of an
+        insight with its authors embedded, or as plain ids when `expand`
+        is False. Summaries carry only the thumbnail of each image, for
+        list responses.
+"""
+class AuthorLoader:
+    def __init__(self):
+        self.authors: Dict[PydanticObjectId, InsightAuthor] = {}
+        self.summaries: Dict[PydanticObjectId, AuthorSummary] = {}
+
+    async def load(self, insights: Iterable[Insight]):
+        missing = {
+            id
+            for insight in insights
+            for id in author_ids(insight)
+            if id not in self.authors
+        }
+        if not missing:
+            return
+
+        for author in await InsightAuthor.find(
+            In(InsightAuthor.id, list(missing))
+        ).to_list():
+            self.authors[author.id] = author
+
+    def serialize(
+        self, insight: Insight, expand: bool = True, summary: bool = False
+    ) -> Union[InsightDetail, InsightSummary]:
+        if summary and "authors" not in insight.model_fields_set:
+            return insight
+
+        ids = author_ids(insight)
+        if not expand:
+            authors = [str(id) for id in ids]
+        elif summary:
+            authors = [self.summary(id) for id in ids if id in self.authors]
+        else:
+            authors = [self.authors[id] for id in ids if id in self.authors]
+
+        view = InsightSummary if summary else InsightDetail
+        return view.model_validate(insight, from_attributes=True).model_copy(
+            update={"authors": authors}
+        )
+
+    def summary(self, id: PydanticObjectId) -> AuthorSummary:
+        if id not in self.summaries:
+            self.summaries[id] = AuthorSummary.model_validate(
+                self.authors[id], from_attributes=True
+            )
+        return self.summaries[id]
+
+
+def author_ids(insight: Insight) -> List[PydanticObjectId]:
+    # Links on documents, raw DBRefs on summaries validated from rows.
+    return [
+        author.ref.id if isinstance(author, Link) else author.id
+        for author in insight.authors
+    ]
@@ -1,18 +1,24 @@
 from beanie import Document, Insert, Replace, Save, before_event, Link
 from datetime import datetime, timezone
-from typing import Optional, Annotated, List
+from pymongo import IndexModel, ASCENDING, DESCENDING, TEXT
+from typing import Dict, Optional, Annotated, List
 from pydantic import Field
+from ...helpers import PREFIX_COLLATION
 
 
 class InsightAuthor(Document):
     full_name: str
     email: str
     file_url: Optional[str] = None
+    file_variants: Dict[str, str] = {}
     created_at: datetime = None
     updated_at: datetime = None
     
     class Settings:
         name = "insight_authors"
+        indexes = [
+            IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        ]
         
     
     @before_event(Insert)
@@ -30,12 +36,29 @@ class Insight(Document):
     title: str
     content: str
     file_url: Optional[str] = None
+    file_variants: Dict[str, str] = {}
     authors: Annotated[List[Link[InsightAuthor]], Field(description="List of authors")]
     created_at: datetime = None
     updated_at: datetime = None
 
     class Settings:
         name = "insights"
+        indexes = [
+            IndexModel([("title", ASCENDING)], name="title_unique", unique=True),
+            IndexModel(
+                [("title", ASCENDING)],
+                name="title_prefix",
+                collation=PREFIX_COLLATION,
+            ),
+            IndexModel(
+                [("created_at", DESCENDING), ("_id", DESCENDING)], name="created_at_sort"
+            ),
+            IndexModel(
+                [("title", TEXT), ("content", TEXT)],
+                weights={"title": 10, "content": 1},
+                name="insight_text",
+            ),
+        ]
 
     @before_event(Insert)
     def set_created_at(self):
@@ -1,18 +1,66 @@
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, UploadFile
-from .schema import InsightSchema, QueryParamsSchema
-from fastapi.responses import JSONResponse
-from beanie.operators import RegEx
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request
+from .schema import (
+    InsightSchema,
+    InsightPatchSchema,
+    QueryParamsSchema,
+    ExportParamsSchema,
+    InsightSummary,
+    SUMMARY_FIELDS,
+    EXPORT_FIELDS,
+)
 from fastapi.security import HTTPAuthorizationCredentials
-from ...dependencies import get_current_user, FileValidator
-from typing import Annotated
+from ...dependencies import get_current_user, ValidatedFile, image_validator
+from typing import Annotated, List, Literal
 from .model import Insight, InsightAuthor
+from .authors import resolve_authors
+from .loader import AuthorLoader
 from motor.motor_asyncio import AsyncIOMotorClient
-from ...utils import connect_to_database
-from ...services import upload_file_to_cloudinary
-from datetime import datetime
+from ...utils import connect_to_database, transaction
+from ...services import (
+    replace_file,
+    delete_and_release,
+    release_files,
+    response_cache,
+    enqueue_upload,
+)
+from ...services.cache import last_modified
+from ...helpers import (
+    paginate,
+    page_limit,
+    invalidate_count,
+    search_filter,
+    search_collation,
+    select_fields,
+    FastJSONResponse,
+    BulkDeleteSchema,
+    BulkItems,
+    bulk_insert,
+    bulk_update,
+    bulk_delete,
+    export_response,
+    TimedRoute,
+)
+from pymongo.errors import DuplicateKeyError
+from datetime import datetime, timezone
 
 
-insight = APIRouter(prefix="/api/v1/insights", tags=["Insight"])
+insight = APIRouter(
+    prefix="/api/v1/insights", tags=["Insight"], route_class=TimedRoute
+)
+
+
+def list_filter(query_params) -> list:
+    filter = []
+    if query_params.year:
+        start = datetime(int(query_params.year), 1, 1)
+        end = datetime(int(query_params.year) + 1, 1, 1)
+
+        filter.append(Insight.created_at >= start)
+        filter.append(Insight.created_at < end)
+
+    if query_params.query:
+        filter.append(search_filter(query_params.search, query_params.query, "title"))
+    return filter
 
 
 @insight.post("/")
@@ -21,30 +69,95 @@ async def create_insight(
     current_user: Annotated[HTTPAuthorizationCredentials, Depends(get_current_user)],
     validated_request: InsightSchema,
 ):
-
-    insight_authors = []
-    for data in validated_request.authors:
-        author = await InsightAuthor.find_one(InsightAuthor.email == data.email)
-        if not author:
-            author = InsightAuthor(**data.model_dump(mode="json"))
-            await author.insert()
-            insight_authors.append(author)
-
     insight = await Insight.find_one(Insight.title == validated_request.title)
     if insight:
         raise HTTPException(
             status_code=409, detail={"message": "Insight already exist"}
         )
 
-    insight = Insight(
-        title=validated_request.title,
-        content=validated_request.content,
-        authors=insight_authors,
+    async with transaction() as session:
+        insight = Insight(
+            title=validated_request.title,
+            content=validated_request.content,
+            authors=await resolve_authors(validated_request.authors, session=session),
+        )
+        try:
+            await insight.insert(session=session)
+        except DuplicateKeyError:
+            raise HTTPException(
+                status_code=409, detail={"message": "Insight already exist"}
+            )
+    invalidate_count(Insight)
+    await response_cache.invalidate("insights")
+    return FastJSONResponse(content={"data": {"insight": insight}}, status_code=201)
+
+
+@insight.post("/bulk")
+async def bulk_create_insight(
+    init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
+    current_user: Annotated[HTTPAuthorizationCredentials, Depends(get_current_user)],
+    validated_request: BulkItems[InsightSchema],
+):
+    insights = [
+        Insight(title=item.title, content=item.content, authors=[])
+        for item in validated_request
+    ]
+
+    # Authors are resolved once duplicate titles have been rejected, for
+    # the insights that will be inserted only, in one lookup and one bulk
+    # upsert.
+    async def attach_authors(indexes: List[int]):
+        items = [validated_request[index] for index in indexes]
+        authors = {
+            author.email: author
+            for author in await resolve_authors(
+                [author for item in items for author in item.authors]
+            )
+        }
+        for index, item in zip(indexes, items):
+            insights[index].authors = [
+                authors[email]
+                for email in dict.fromkeys(author.email for author in item.authors)
+            ]
+
+    results = await bulk_insert(
+        Insight, insights, "title", "Insight", prepare=attach_authors
     )
-    await insight.insert()
-    return JSONResponse(
-        content={"data": {"insight": insight.model_dump(mode="json")}}, status_code=201
+    invalidate_count(Insight)
+    await response_cache.invalidate("insights")
+    return FastJSONResponse(content={"data": {"results": results}}, status_code=200)
+
+
+@insight.patch("/bulk")
+async def bulk_update_insight(
+    init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
+    current_user: Annotated[HTTPAuthorizationCredentials, Depends(get_current_user)],
+    validated_request: BulkItems[InsightPatchSchema],
+):
+    results = await bulk_update(
+        Insight,
+        [
+            (item.id, item.model_dump(exclude={"id"}, exclude_none=True))
+            for item in validated_request
+        ],
+        "title",
+        "Insight",
     )
+    await response_cache.invalidate("insights")
+    return FastJSONResponse(content={"data": {"results": results}}, status_code=200)
+
+
+@insight.delete("/bulk")
+async def bulk_delete_insight(
+    init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
+    current_user: Annotated[HTTPAuthorizationCredentials, Depends(get_current_user)],
+    validated_request: BulkDeleteSchema,
+):
+    results, file_urls = await bulk_delete(Insight, validated_request.ids, "Insight")
+    await release_files(file_urls)
+    invalidate_count(Insight)
+    await response_cache.invalidate("insights")
+    return FastJSONResponse(content={"data": {"results": results}}, status_code=200)
 
 
 @insight.patch("/{id}/upload")
@@ -52,20 +165,34 @@ async def upload_insight_file(
     init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
     current_user: Annotated[HTTPAuthorizationCredentials, Depends(get_current_user)],
     id: Annotated[str, Path()],
-    file: UploadFile,
-    validate_file: Annotated[bool, Depends(FileValidator)],
+    file: Annotated[ValidatedFile, Depends(image_validator)],
+    author_loader: Annotated[AuthorLoader, Depends(AuthorLoader)],
+    mode: Annotated[Literal["sync", "async"], Query()] = "sync",
 ):
-    insight = await Insight.get(id, fetch_links=True)
+    insight = await Insight.get(id)
     if insight is None:
         raise HTTPException(
             status_code=404, detail={"message": "Insight does not exist"}
         )
 
-    uploaded_file = upload_file_to_cloudinary(file)
-    await insight.set({Insight.file_url: uploaded_file})
+    if mode == "async":
+        job = await enqueue_upload("insights", insight.id, file)
+        return FastJSONResponse(
+            content={"data": {"job": job.public_dump()}},
+            status_code=202,
+            headers={"Location": f"/api/v1/jobs/{job.id}"},
+        )
 
-    return JSONResponse(
-        content={"data": {"insight": insight.model_dump(mode="json")}}, status_code=200
+    if await replace_file(insight, file) is None:
+        raise HTTPException(
+            status_code=404, detail={"message": "Insight does not exist"}
+        )
+    await response_cache.invalidate("insights")
+
+    await author_loader.load([insight])
+    return FastJSONResponse(
+        content={"data": {"insight": author_loader.serialize(insight)}},
+        status_code=200,
     )
 
 
@@ -75,79 +202,159 @@ async def upload_insight_author_file(
     current_user: Annotated[HTTPAuthorizationCredentials, Depends(get_current_user)],
     insight_id: Annotated[str, Path()],
     author_id: Annotated[str, Path()],
-    file: UploadFile,
-    validate_file: Annotated[bool, Depends(FileValidator)],
+    file: Annotated[ValidatedFile, Depends(image_validator)],
+    author_loader: Annotated[AuthorLoader, Depends(AuthorLoader)],
+    mode: Annotated[Literal["sync", "async"], Query()] = "sync",
 ):
-    insight = await Insight.get(insight_id, fetch_links=True)
+    insight = await Insight.get(insight_id)
     if insight is None:
         raise HTTPException(
             status_code=404, detail={"message": "Insight does not exist"}
         )
 
-    insight_author = await InsightAuthor.get(author_id, fetch_links=True)
+    insight_author = await InsightAuthor.get(author_id)
     if insight_author is None:
         raise HTTPException(
             status_code=404, detail={"message": "Author does not exist"}
         )
 
-    uploaded_file = upload_file_to_cloudinary(file)
-    await insight_author.set({InsightAuthor.file_url: uploaded_file})
+    if mode == "async":
+        job = await enqueue_upload("insight_authors", insight_author.id, file)
+        return FastJSONResponse(
+            content={"data": {"job": job.public_dump()}},
+            status_code=202,
+            headers={"Location": f"/api/v1/jobs/{job.id}"},
+        )
+
+    if await replace_file(insight_author, file) is None:
+        raise HTTPException(
+            status_code=404, detail={"message": "Author does not exist"}
+        )
+    await response_cache.invalidate("insights")
 
-    return JSONResponse(
-        content={"data": {"insight": insight.model_dump(mode="json")}}, status_code=200
+    await author_loader.load([insight])
+    return FastJSONResponse(
+        content={"data": {"insight": author_loader.serialize(insight)}},
+        status_code=200,
     )
 
 
 @insight.get("/")
 async def list_insight(
+    request: Request,
     init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
     query_params: Annotated[QueryParamsSchema, Query()],
+    author_loader: Annotated[AuthorLoader, Depends(AuthorLoader)],
 ):
-    filter = []
-    if query_params.year:
-        start = datetime(int(query_params.year), 1, 1)
-        end = datetime(int(query_params.year) + 1, 1, 1)
+    cached = await response_cache.lookup(request, "insights")
+    if cached:
+        return cached
 
-        filter.append(Insight.created_at >= start)
-        filter.append(Insight.created_at < end)
-
-    if query_params.query:
-        filter.append(RegEx(Insight.title, query_params.query, options="i"))
-
-    insights = (
-        await Insight.find(*filter, fetch_links=True)
-        .skip((query_params.page - 1) * query_params.limit)
-        .limit(10)
-        .to_list()
+    filter = list_filter(query_params)
+    ranked = bool(query_params.query) and query_params.search == "text"
+    fields = select_fields(
+        InsightSummary,
+        query_params.fields,
+        SUMMARY_FIELDS,
+        excerpt=("content", query_params.summary_length),
     )
+    page = await paginate(
+        Insight,
+        filter,
+        "created_at",
+        query_params,
+        ranked=ranked,
+        projection=InsightSummary,
+        fields=fields,
+        collation=search_collation(query_params.search, query_params.query),
+    )
+
+    expand = query_params.expand == "authors"
+    if expand:
+        await author_loader.load(page.items)
 
-    total_insight = await Insight.count()
-    return JSONResponse(
-        content={
+    return await response_cache.respond(
+        request,
+        "insights",
+        {
             "data": {
-                "insight": [insight.model_dump(mode="json") for insight in insights],
+                "insight": [
+                    author_loader.serialize(insight, expand, summary=True)
+                    for insight in page.items
+                ],
                 "page": query_params.page,
-                "limit": query_params.limit,
-                "total_insight": total_insight,
+                "limit": page_limit(query_params.limit),
+                "next_cursor": page.next_cursor,
+                "total_insight": page.total,
+                "total_estimated": page.total_estimated,
             }
         },
-        status_code=200,
+        last_modified=last_modified(page.items),
+    )
+
+
+@insight.get("/export")
+async def export_insight(
+    init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
+    current_user: Annotated[HTTPAuthorizationCredentials, Depends(get_current_user)],
+    query_params: Annotated[ExportParamsSchema, Query()],
+):
+    expand = query_params.expand == "authors"
+
+    async def resolve_authors_batch(insights: list) -> list:
+        # A loader per batch keeps the identity map bounded by the batch.
+        author_loader = AuthorLoader()
+        if expand:
+            await author_loader.load(insights)
+        return [
+            author_loader.serialize(insight, expand, summary=True)
+            for insight in insights
+        ]
+
+    fields = select_fields(
+        InsightSummary,
+        query_params.fields,
+        EXPORT_FIELDS,
+        excerpt=("content", query_params.summary_length),
+    )
+    return export_response(
+        Insight,
+        list_filter(query_params),
+        "created_at",
+        InsightSummary,
+        fields,
+        query_params.format,
+        "insights",
+        transform=resolve_authors_batch,
+        collation=search_collation(query_params.search, query_params.query),
     )
 
 
 @insight.get("/{id}")
 async def get_insight(
+    request: Request,
     init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
     id: Annotated[str, Path()],
+    author_loader: Annotated[AuthorLoader, Depends(AuthorLoader)],
+    expand: Annotated[Literal["authors", "none"], Query()] = "authors",
 ):
-    insight = await Insight.get(id, fetch_links=True)
+    cached = await response_cache.lookup(request, "insights")
+    if cached:
+        return cached
+
+    insight = await Insight.get(id)
     if insight is None:
         raise HTTPException(
             status_code=404, detail={"message": "Insight does not exist"}
         )
 
-    return JSONResponse(
-        content={"data": {"insight": insight.model_dump(mode="json")}}, status_code=200
+    if expand == "authors":
+        await author_loader.load([insight])
+    return await response_cache.respond(
+        request,
+        "insights",
+        {"data": {"insight": author_loader.serialize(insight, expand == "authors")}},
+        last_modified=insight.updated_at,
     )
 
 
@@ -167,10 +374,19 @@ async def update_insight(
     
     
 
-    await insight.set({**validated_request.model_dump(mode="json")})
-    return JSONResponse(
-        content={"data": {"insight": insight.model_dump(mode="json")}}, status_code=200
-    )
+    try:
+        await insight.set(
+            {
+                **validated_request.model_dump(mode="json"),
+                Insight.updated_at: datetime.now(timezone.utc),
+            }
+        )
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=409, detail={"message": "Insight already exist"}
+        )
+    await response_cache.invalidate("insights")
+    return FastJSONResponse(content={"data": {"insight": insight}}, status_code=200)
 
 
 @insight.delete("/{id}")
@@ -185,5 +401,10 @@ async def delete_insight(
             status_code=404, detail={"message": "Insight does not exist"}
         )
 
-    await insight.delete()
-    return JSONResponse(content={"message": "Insight deleted"}, status_code=200)
+    if not await delete_and_release(insight):
+        raise HTTPException(
+            status_code=404, detail={"message": "Insight does not exist"}
+        )
+    invalidate_count(Insight)
+    await response_cache.invalidate("insights")
+    return FastJSONResponse(content={"message": "Insight deleted"}, status_code=200)
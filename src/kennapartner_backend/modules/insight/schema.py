@@ -1,5 +1,8 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List, Annotated
+from pydantic import BaseModel, ConfigDict, Field
+from beanie import PydanticObjectId
+from typing import Any, Dict, Optional, Literal, List, Annotated
+from datetime import datetime
+from ...helpers import Projection, SearchMode
 
 
 class Author(BaseModel):
@@ -13,8 +16,82 @@ class InsightSchema(BaseModel):
     authors: Annotated[List[Author], Field(description="List of authors")]
 
 
+class InsightPatchSchema(BaseModel):
+    id: str
+    title: Optional[str] = None
+    content: Optional[str] = None
+
+
 class QueryParamsSchema(BaseModel):
     page: int = Field(1, gt=0, le=100)
-    limit: int = Field(10, ge=0)
+    limit: int = Field(10, gt=0)
+    cursor: Optional[str] = None
     year: Optional[str] = None
     query: Optional[str] = None
+    search: SearchMode = "text"
+    expand: Literal["authors", "none"] = "authors"
+    fields: Optional[str] = None
+    summary_length: Optional[int] = Field(None, gt=0, le=1000)
+
+
+class AuthorSummary(Projection):
+    id: PydanticObjectId = Field(alias="_id")
+    full_name: str
+    email: str
+    created_at: datetime = None
+    updated_at: datetime = None
+
+
+class ExportParamsSchema(BaseModel):
+    format: Literal["ndjson", "csv"] = "ndjson"
+    year: Optional[str] = None
+    query: Optional[str] = None
+    search: SearchMode = "text"
+    expand: Literal["authors", "none"] = "authors"
+    fields: Optional[str] = None
+    summary_length: Optional[int] = Field(None, gt=0, le=1000)
+
+
+# Fields returned by the list endpoint when `fields=` is not given.
+SUMMARY_FIELDS = (
+    "title",
+    "authors",
+    "file_variants",
+    "created_at",
+    "updated_at",
+)
+
+
+class InsightSummary(Projection):
+    id: PydanticObjectId = Field(alias="_id")
+    title: Optional[str] = None
+    content: Optional[str] = None
+    file_url: Optional[str] = None
+    authors: List[Any] = []
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class InsightDetail(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: PydanticObjectId = Field(alias="_id")
+    title: str
+    content: str
+    file_url: Optional[str] = None
+    file_variants: Dict[str, str] = {}
+    authors: List[Any] = []
+    created_at: datetime = None
+    updated_at: datetime = None
+
+
+# Fields exported when `fields=` is not given.
+EXPORT_FIELDS = (
+    "title",
+    "content",
+    "authors",
+    "file_url",
+    "file_variants",
+    "created_at",
+    "updated_at",
+)
@@ -0,0 +1 @@
+from .route import jobs
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, HTTPException, Path
+from fastapi.security import HTTPAuthorizationCredentials
+from ...dependencies import get_current_user
+from typing import Annotated
+from motor.motor_asyncio import AsyncIOMotorClient
+from ...utils import connect_to_database
+from ...helpers import FastJSONResponse, TimedRoute
+from ...services.jobs import get_job_queue
+
+
+jobs = APIRouter(prefix="/api/v1/jobs", tags=["Job"], route_class=TimedRoute)
+
+
+@jobs.get("/{id}")
+async def get_job(
+    init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
+    current_user: Annotated[HTTPAuthorizationCredentials, Depends(get_current_user)],
+    id: Annotated[str, Path()],
+):
+    job = await get_job_queue().get(id)
+    if job is None:
+        raise HTTPException(status_code=404, detail={"message": "Job does not exist"})
+
+    return FastJSONResponse(
+        content={"data": {"job": job.public_dump()}}, status_code=200
+    )
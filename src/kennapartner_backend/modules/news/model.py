@@ -1,17 +1,36 @@
 from beanie import Document, Insert, Replace, Save, before_event
 from datetime import datetime, timezone
-from typing import Optional
+from pymongo import IndexModel, ASCENDING, DESCENDING, TEXT
+from typing import Dict, Optional
+from ...helpers import PREFIX_COLLATION
 
 
 class News(Document):
     title: str
     content: str
     file_url: Optional[str] = None
+    file_variants: Dict[str, str] = {}
     created_at: datetime = None
     updated_at: datetime = None
 
     class Settings:
         name = "news"
+        indexes = [
+            IndexModel([("title", ASCENDING)], name="title_unique", unique=True),
+            IndexModel(
+                [("title", ASCENDING)],
+                name="title_prefix",
+                collation=PREFIX_COLLATION,
+            ),
+            IndexModel(
+                [("created_at", DESCENDING), ("_id", DESCENDING)], name="created_at_sort"
+            ),
+            IndexModel(
+                [("title", TEXT), ("content", TEXT)],
+                weights={"title": 10, "content": 1},
+                name="news_text",
+            ),
+        ]
 
     @before_event(Insert)
     def set_created_at(self):
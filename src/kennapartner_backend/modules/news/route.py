@@ -1,18 +1,62 @@
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, UploadFile
-from .schema import BookSchema, QueryParamsSchema
-from fastapi.responses import JSONResponse
-from beanie.operators import RegEx
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request
+from .schema import (
+    BookSchema,
+    NewsPatchSchema,
+    QueryParamsSchema,
+    ExportParamsSchema,
+    NewsSummary,
+    SUMMARY_FIELDS,
+    EXPORT_FIELDS,
+)
 from fastapi.security import HTTPAuthorizationCredentials
-from ...dependencies import get_current_user, FileValidator
-from typing import Annotated
+from ...dependencies import get_current_user, ValidatedFile, image_validator
+from typing import Annotated, Literal
 from .model import News
 from motor.motor_asyncio import AsyncIOMotorClient
 from ...utils import connect_to_database
-from ...services import upload_file_to_cloudinary
-from datetime import datetime
+from ...services import (
+    replace_file,
+    delete_and_release,
+    release_files,
+    response_cache,
+    enqueue_upload,
+)
+from ...services.cache import last_modified
+from ...helpers import (
+    paginate,
+    page_limit,
+    invalidate_count,
+    search_filter,
+    search_collation,
+    select_fields,
+    FastJSONResponse,
+    BulkDeleteSchema,
+    BulkItems,
+    bulk_insert,
+    bulk_update,
+    bulk_delete,
+    export_response,
+    TimedRoute,
+)
+from pymongo.errors import DuplicateKeyError
+from datetime import datetime, timezone
 
 
-news = APIRouter(prefix="/api/v1/news", tags=["News"])
+news = APIRouter(prefix="/api/v1/news", tags=["News"], route_class=TimedRoute)
+
+
+def list_filter(query_params) -> list:
+    filter = []
+    if query_params.year:
+        start = datetime(int(query_params.year), 1, 1)
+        end = datetime(int(query_params.year) + 1, 1, 1)
+
+        filter.append(News.created_at >= start)
+        filter.append(News.created_at < end)
+
+    if query_params.query:
+        filter.append(search_filter(query_params.search, query_params.query, "title"))
+    return filter
 
 
 @news.post("/")
@@ -21,13 +65,63 @@ async def create_news(
     current_user: Annotated[HTTPAuthorizationCredentials, Depends(get_current_user)],
     validated_request: BookSchema,
 ):
-    news = await News.find_one(News.title == validated_request.title)
-    if news:
+    news = News(**validated_request.model_dump(mode="json"))
+    try:
+        await news.insert()
+    except DuplicateKeyError:
         raise HTTPException(status_code=409, detail={"message": "News already exist"})
+    invalidate_count(News)
+    await response_cache.invalidate("news")
+    return FastJSONResponse(content={"data": {"news": news}}, status_code=201)
 
-    news = News(**validated_request.model_dump(mode="json"))
-    await news.insert()
-    return JSONResponse(content={"data": {"news": news.model_dump(mode="json")}}, status_code=201)
+
+@news.post("/bulk")
+async def bulk_create_news(
+    init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
+    current_user: Annotated[HTTPAuthorizationCredentials, Depends(get_current_user)],
+    validated_request: BulkItems[BookSchema],
+):
+    results = await bulk_insert(
+        News,
+        [News(**item.model_dump()) for item in validated_request],
+        "title",
+        "News",
+    )
+    invalidate_count(News)
+    await response_cache.invalidate("news")
+    return FastJSONResponse(content={"data": {"results": results}}, status_code=200)
+
+
+@news.patch("/bulk")
+async def bulk_update_news(
+    init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
+    current_user: Annotated[HTTPAuthorizationCredentials, Depends(get_current_user)],
+    validated_request: BulkItems[NewsPatchSchema],
+):
+    results = await bulk_update(
+        News,
+        [
+            (item.id, item.model_dump(exclude={"id"}, exclude_none=True))
+            for item in validated_request
+        ],
+        "title",
+        "News",
+    )
+    await response_cache.invalidate("news")
+    return FastJSONResponse(content={"data": {"results": results}}, status_code=200)
+
+
+@news.delete("/bulk")
+async def bulk_delete_news(
+    init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
+    current_user: Annotated[HTTPAuthorizationCredentials, Depends(get_current_user)],
+    validated_request: BulkDeleteSchema,
+):
+    results, file_urls = await bulk_delete(News, validated_request.ids, "News")
+    await release_files(file_urls)
+    invalidate_count(News)
+    await response_cache.invalidate("news")
+    return FastJSONResponse(content={"data": {"results": results}}, status_code=200)
 
 
 @news.patch("/{id}/upload")
@@ -35,69 +129,116 @@ async def upload_file(
     init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
     current_user: Annotated[HTTPAuthorizationCredentials, Depends(get_current_user)],
     id: Annotated[str, Path()],
-    file: UploadFile,
-    validate_file: Annotated[bool, Depends(FileValidator)],
+    file: Annotated[ValidatedFile, Depends(image_validator)],
+    mode: Annotated[Literal["sync", "async"], Query()] = "sync",
 ):
     news = await News.get(id)
     if news is None:
         raise HTTPException(status_code=404, detail={"message": "News does not exist"})
 
-    uploaded_file = upload_file_to_cloudinary(file)
+    if mode == "async":
+        job = await enqueue_upload("news", news.id, file)
+        return FastJSONResponse(
+            content={"data": {"job": job.public_dump()}},
+            status_code=202,
+            headers={"Location": f"/api/v1/jobs/{job.id}"},
+        )
 
-    await news.set({News.file_url: uploaded_file})
-    return JSONResponse(
-        content={"data": {"news": news.model_dump(mode="json")}}, status_code=200
-    )
+    if await replace_file(news, file) is None:
+        raise HTTPException(status_code=404, detail={"message": "News does not exist"})
+    await response_cache.invalidate("news")
+    return FastJSONResponse(content={"data": {"news": news}}, status_code=200)
 
 
 @news.get("/")
 async def list_news(
+    request: Request,
     init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
     query_params: Annotated[QueryParamsSchema, Query()],
 ):
-    filter = []
-    if query_params.year:
-        start = datetime(int(query_params.year), 1, 1)
-        end = datetime(int(query_params.year) + 1, 1, 1)
-
-        filter.append(News.created_at >= start)
-        filter.append(News.created_at < end)
-
-    if query_params.query:
-        filter.append(RegEx(News.title, query_params.query, options="i"))
+    cached = await response_cache.lookup(request, "news")
+    if cached:
+        return cached
 
-    news = (
-        await News.find(*filter)
-        .skip((query_params.page - 1) * query_params.limit)
-        .limit(10)
-        .to_list()
+    filter = list_filter(query_params)
+    ranked = bool(query_params.query) and query_params.search == "text"
+    fields = select_fields(
+        NewsSummary,
+        query_params.fields,
+        SUMMARY_FIELDS,
+        excerpt=("content", query_params.summary_length),
+    )
+    page = await paginate(
+        News,
+        filter,
+        "created_at",
+        query_params,
+        ranked=ranked,
+        projection=NewsSummary,
+        fields=fields,
+        collation=search_collation(query_params.search, query_params.query),
     )
 
-    total_news = await News.count()
-    return JSONResponse(
-        content={
+    return await response_cache.respond(
+        request,
+        "news",
+        {
             "data": {
-                "news": [news_.model_dump(mode="json") for news_ in news],
+                "news": page.items,
                 "page": query_params.page,
-                "limit": query_params.limit,
-                "total_news": total_news,
+                "limit": page_limit(query_params.limit),
+                "next_cursor": page.next_cursor,
+                "total_news": page.total,
+                "total_estimated": page.total_estimated,
             }
         },
-        status_code=200,
+        last_modified=last_modified(page.items),
+    )
+
+
+@news.get("/export")
+async def export_news(
+    init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
+    current_user: Annotated[HTTPAuthorizationCredentials, Depends(get_current_user)],
+    query_params: Annotated[ExportParamsSchema, Query()],
+):
+    fields = select_fields(
+        NewsSummary,
+        query_params.fields,
+        EXPORT_FIELDS,
+        excerpt=("content", query_params.summary_length),
+    )
+    return export_response(
+        News,
+        list_filter(query_params),
+        "created_at",
+        NewsSummary,
+        fields,
+        query_params.format,
+        "news",
+        collation=search_collation(query_params.search, query_params.query),
     )
 
 
 @news.get("/{id}")
 async def get_news(
+    request: Request,
     init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
     id: Annotated[str, Path()],
 ):
+    cached = await response_cache.lookup(request, "news")
+    if cached:
+        return cached
+
     news = await News.get(id)
     if news is None:
         raise HTTPException(status_code=404, detail={"message": "News does not exist"})
 
-    return JSONResponse(
-        content={"data": {"news": news.model_dump(mode="json")}}, status_code=200
+    return await response_cache.respond(
+        request,
+        "news",
+        {"data": {"news": news}},
+        last_modified=news.updated_at,
     )
 
 
@@ -112,10 +253,17 @@ async def update_news(
     if news is None:
         raise HTTPException(status_code=404, detail={"message": "News does not exist"})
 
-    await news.set({**validated_request.model_dump(mode="json")})
-    return JSONResponse(
-        content={"data": {"news": news.model_dump(mode="json")}}, status_code=200
-    )
+    try:
+        await news.set(
+            {
+                **validated_request.model_dump(mode="json"),
+                News.updated_at: datetime.now(timezone.utc),
+            }
+        )
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail={"message": "News already exist"})
+    await response_cache.invalidate("news")
+    return FastJSONResponse(content={"data": {"news": news}}, status_code=200)
 
 
 @news.delete("/{id}")
@@ -128,5 +276,8 @@ async def delete_news(
     if news is None:
         raise HTTPException(status_code=404, detail={"message": "News does not exist"})
 
-    await news.delete()
-    return JSONResponse(content={"message": "News deleted"}, status_code=200)
+    if not await delete_and_release(news):
+        raise HTTPException(status_code=404, detail={"message": "News does not exist"})
+    invalidate_count(News)
+    await response_cache.invalidate("news")
+    return FastJSONResponse(content={"message": "News deleted"}, status_code=200)
@@ -1,5 +1,8 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from beanie import PydanticObjectId
+from typing import Optional, Literal
+from datetime import datetime
+from ...helpers import Projection, SearchMode
 
 class BookSchema(BaseModel):
     title: str
@@ -7,8 +10,51 @@ class BookSchema(BaseModel):
     
 
 
+class NewsPatchSchema(BaseModel):
+    id: str
+    title: Optional[str] = None
+    content: Optional[str] = None
+
+
 class QueryParamsSchema(BaseModel):
     page: int = Field(1, gt=0, le=100)
-    limit: int = Field(10, ge=0)
+    limit: int = Field(10, gt=0)
+    cursor: Optional[str] = None
+    year: Optional[str] = None
+    query: Optional[str] = None
+    search: SearchMode = "text"
+    fields: Optional[str] = None
+    summary_length: Optional[int] = Field(None, gt=0, le=1000)
+
+
+class ExportParamsSchema(BaseModel):
+    format: Literal["ndjson", "csv"] = "ndjson"
     year: Optional[str] = None
     query: Optional[str] = None
+    search: SearchMode = "text"
+    fields: Optional[str] = None
+    summary_length: Optional[int] = Field(None, gt=0, le=1000)
+
+
+# Fields returned by the list endpoint when `fields=` is not given.
+SUMMARY_FIELDS = ("title", "file_variants", "created_at", "updated_at")
+
+
+class NewsSummary(Projection):
+    id: PydanticObjectId = Field(alias="_id")
+    title: Optional[str] = None
+    content: Optional[str] = None
+    file_url: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+# Fields exported when `fields=` is not given.
+EXPORT_FIELDS = (
+    "title",
+    "content",
+    "file_url",
+    "file_variants",
+    "created_at",
+    "updated_at",
+)
@@ -1 +1,11 @@
-from .upload import upload_file_to_cloudinary
\ No newline at end of file
+from .storage import (
+    get_storage,
+    close_storage,
+    close_variant_pool,
+    replace_file,
+    delete_and_release,
+    release_file,
+    release_files,
+)
+from .cache import response_cache
+from .jobs import enqueue_upload, start_upload_workers, stop_upload_workers
@@ -0,0 +1,42 @@
+from .backend import CacheBackend, MemoryCacheBackend, RedisCacheBackend
+from .response import ResponseCache, last_modified
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+"""
+Application response cache.
+
+Without RESPONSE_CACHE_URL responses are cached in process memory, and so
+are the generation counters that invalidation bumps: a write handled by
+one worker process would leave the others serving the old responses until
+their entries expire. The memory backend is therefore only used by a
+single process; when WEB_CONCURRENCY (read by uvicorn and gunicorn as the
+number of workers) is above 1, RESPONSE_CACHE_URL is required unless
+caching is disabled with RESPONSE_CACHE_TTL=0.
+
+Environment:
+    RESPONSE_CACHE_TTL     Lifetime of a cached response in seconds (default: 60).
+    RESPONSE_CACHE_SIZE    Entries kept by the in-process LRU (default: 1024).
+    RESPONSE_CACHE_URL     redis:// URL of a cache shared by all workers;
+                           required with several worker processes.
+    WEB_CONCURRENCY        Number of worker processes (default: 1).
+"""
+
+
+def create_cache_backend() -> CacheBackend:
+    ttl = float(os.getenv("RESPONSE_CACHE_TTL", 60))
+    url = os.getenv("RESPONSE_CACHE_URL")
+    if url:
+        return RedisCacheBackend(url, ttl=ttl)
+    if ttl > 0 and int(os.getenv("WEB_CONCURRENCY", 1)) > 1:
+        raise RuntimeError(
+            "RESPONSE_CACHE_URL is required when running several workers"
+        )
+    maxsize = int(os.getenv("RESPONSE_CACHE_SIZE", 1024))
+    return MemoryCacheBackend(ttl=ttl, maxsize=maxsize)
+
+
+response_cache = ResponseCache(create_cache_backend())
@@ -0,0 +1,99 @@
+from ...utils.ttl_cache import TTLCache
+from typing import Any, Optional
+import json
+
+
+"""
+Storage backends for the response cache.
+
+Attributes:
+    ttl (float): Default lifetime of a cached entry in seconds.
+
+Methods:
+    get(key): Return a cached value or None.
+    set(key, value, ttl): Store a JSON-serialisable value.
+    counter(key): Return the current value of a counter.
+    incr(key): Atomically increment a counter and return its new value.
+    close(): Release any connections held by the backend.
+"""
+class CacheBackend:
+    def __init__(self, ttl: float = 60):
+        self.ttl = ttl
+
+    async def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        raise NotImplementedError
+
+    async def counter(self, key: str) -> int:
+        raise NotImplementedError
+
+    async def incr(self, key: str) -> int:
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+"""
+In-process cache for a single worker process. Entries and generation
+counters are not shared, so invalidations do not reach other processes.
+"""
+class MemoryCacheBackend(CacheBackend):
+    def __init__(self, ttl: float = 60, maxsize: int = 1024):
+        super().__init__(ttl)
+        self.entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.counters: dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self.entries.get(key)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self.entries.set(key, value, ttl)
+
+    async def counter(self, key: str) -> int:
+        return self.counters.get(key, 0)
+
+    async def incr(self, key: str) -> int:
+        self.counters[key] = self.counters.get(key, 0) + 1
+        return self.counters[key]
+
+
+"""
+Shared cache backed by Redis, for deployments running several workers.
+
+Requires the optional `redis` package.
+"""
+class RedisCacheBackend(CacheBackend):
+    def __init__(self, url: str, ttl: float = 60, prefix: str = "kenna:cache:"):
+        super().__init__(ttl)
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError(
+                "RESPONSE_CACHE_URL requires the 'redis' package to be installed"
+            ) from e
+
+        self.client = redis.from_url(url)
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = await self.client.get(self.prefix + key)
+        return None if value is None else json.loads(value)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        await self.client.set(
+            self.prefix + key, json.dumps(value), px=int(ttl * 1000)
+        )
+
+    async def counter(self, key: str) -> int:
+        value = await self.client.get(self.prefix + key)
+        return 0 if value is None else int(value)
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(self.prefix + key)
+
+    async def close(self):
+        await self.client.aclose()
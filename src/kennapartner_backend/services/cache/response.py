@@ -0,0 +1,104 @@
+from fastapi import Request, Response
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Optional
+from urllib.parse import urlencode
+import hashlib
+
+from .backend import CacheBackend
+from ...helpers.json_response import FastJSONResponse
+
+
+"""
+Cache of rendered GET responses with ETag / Last-Modified validators.
+
+Entries are keyed by resource namespace, route path and the normalised
+query string. Each namespace carries a generation counter that is part of
+every key, so `invalidate(namespace)` drops all of a resource's list and
+detail entries at once by bumping the counter.
+
+Attributes:
+    backend (CacheBackend): Where rendered responses are stored.
+
+Methods:
+    lookup(request, namespace): Return a cached 200 or 304 response, or None.
+    respond(request, namespace, content, last_modified): Render, store and
+        return a response for content fetched from the database.
+    invalidate(namespace): Discard every cached entry of a resource.
+"""
+class ResponseCache:
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+
+    async def cache_key(self, request: Request, namespace: str) -> str:
+        generation = await self.backend.counter(f"generation:{namespace}")
+        query = urlencode(sorted(request.query_params.multi_items()))
+        return f"{namespace}:{generation}:{request.url.path}?{query}"
+
+    async def lookup(self, request: Request, namespace: str) -> Optional[Response]:
+        # The key is fixed before the database is read, so an invalidation
+        # that lands while the handler runs leaves the stored entry orphaned
+        # under the previous generation instead of serving stale data.
+        request.state.cache_key = await self.cache_key(request, namespace)
+        entry = await self.backend.get(request.state.cache_key)
+        if entry is None:
+            return None
+        return self.to_response(request, entry)
+
+    async def respond(
+        self,
+        request: Request,
+        namespace: str,
+        content: dict,
+        last_modified: Optional[datetime] = None,
+    ) -> Response:
+        body = FastJSONResponse(content=content).body
+        entry = {
+            "body": body.decode("utf-8"),
+            "etag": f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"',
+            "last_modified": http_date(last_modified) if last_modified else None,
+        }
+        key = getattr(request.state, "cache_key", None)
+        await self.backend.set(key or await self.cache_key(request, namespace), entry)
+        return self.to_response(request, entry)
+
+    async def invalidate(self, namespace: str):
+        await self.backend.incr(f"generation:{namespace}")
+
+    def to_response(self, request: Request, entry: dict) -> Response:
+        headers = {"ETag": entry["etag"], "Cache-Control": "no-cache"}
+        if entry["last_modified"]:
+            headers["Last-Modified"] = entry["last_modified"]
+
+        if etag_matches(request.headers.get("if-none-match"), entry["etag"]):
+            return Response(status_code=304, headers=headers)
+
+        return Response(
+            content=entry["body"],
+            status_code=200,
+            media_type="application/json",
+            headers=headers,
+        )
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = if_none_match.split(",")
+    return etag in [value.strip().removeprefix("W/") for value in candidates]
+
+
+def http_date(value: datetime) -> str:
+    # Mongo returns naive datetimes that are already in UTC.
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def last_modified(documents: list) -> Optional[datetime]:
+    return max(
+        (document.updated_at for document in documents if document.updated_at),
+        default=None,
+    )
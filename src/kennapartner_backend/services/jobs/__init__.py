@@ -0,0 +1,10 @@
+from .base import JobQueue
+from .model import UploadJob
+from .mongo import MongoJobQueue
+from .worker import UploadWorkerPool
+from .provider import (
+    get_job_queue,
+    enqueue_upload,
+    start_upload_workers,
+    stop_upload_workers,
+)
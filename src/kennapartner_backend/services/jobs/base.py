@@ -0,0 +1,38 @@
+from typing import Optional
+from .model import UploadJob
+
+
+"""
+Interface of a persistent upload job queue.
+
+A claimed job is leased to one worker for a limited time. A worker that
+dies mid-job simply lets its lease expire, after which the job can be
+claimed again, so queued and in-flight work survives restarts.
+
+Methods:
+    enqueue(job): Persist a new job.
+    claim(): Lease the oldest runnable job, or return None.
+    renew(job): Extend the lease of a running job; False once it is lost.
+    complete(job, file_url): Mark a leased job as succeeded.
+    fail(job, error): Requeue a leased job after a backoff, or mark it
+        failed once it has used up its attempts.
+    get(id): Return a job by id, or None (also for a malformed id).
+"""
+class JobQueue:
+    async def enqueue(self, job: UploadJob) -> UploadJob:
+        raise NotImplementedError
+
+    async def claim(self) -> Optional[UploadJob]:
+        raise NotImplementedError
+
+    async def renew(self, job: UploadJob) -> bool:
+        raise NotImplementedError
+
+    async def complete(self, job: UploadJob, file_url: str):
+        raise NotImplementedError
+
+    async def fail(self, job: UploadJob, error: str, retry: bool = True) -> bool:
+        raise NotImplementedError
+
+    async def get(self, id: str) -> Optional[UploadJob]:
+        raise NotImplementedError
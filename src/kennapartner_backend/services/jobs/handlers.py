@@ -0,0 +1,64 @@
+from beanie import Document
+from typing import Dict, Tuple, Type
+from .model import UploadJob
+from .spool import remove_spool
+from ..storage import replace_file
+from ..cache import response_cache
+from ...dependencies.file_validation import ValidatedFile
+
+
+class JobError(Exception):
+    """A job failure that retrying cannot fix."""
+
+
+def upload_targets() -> Dict[str, Tuple[Type[Document], str]]:
+    from ...modules import Book, News, Insight, InsightAuthor
+
+    return {
+        "books": (Book, "books"),
+        "news": (News, "news"),
+        "insights": (Insight, "insights"),
+        "insight_authors": (InsightAuthor, "insights"),
+    }
+
+
+"""
+Store the spooled file of an upload job and point the target document's
+`file_url` at it, exactly as the synchronous upload routes do. A retry of
+a job that already moved the pointer finds its own URL there and swaps it
+for itself, leaving the reference counts balanced.
+
+Returns:
+    str: The URL of the stored file.
+"""
+async def run_upload_job(job: UploadJob) -> str:
+    if job.resource not in upload_targets():
+        raise JobError(f"Unknown resource {job.resource}")
+    model, namespace = upload_targets()[job.resource]
+
+    document = await model.get(job.document_id)
+    if document is None:
+        raise JobError("Document does not exist")
+
+    try:
+        spooled = open(job.spool_path, "rb")
+    except FileNotFoundError:
+        raise JobError("Spooled file is missing")
+
+    with spooled:
+        stored = await replace_file(
+            document,
+            ValidatedFile(
+                file=spooled,
+                filename=job.filename,
+                content_type=job.content_type,
+                size=job.size,
+                sha256=job.sha256,
+            ),
+        )
+
+    if stored is None:
+        raise JobError("Document does not exist")
+    await response_cache.invalidate(namespace)
+    await remove_spool(job.spool_path)
+    return stored.url
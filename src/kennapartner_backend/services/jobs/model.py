@@ -0,0 +1,46 @@
+from beanie import Document, Insert, Replace, Save, before_event
+from datetime import datetime, timezone
+from pymongo import IndexModel, ASCENDING
+from typing import Literal, Optional
+
+
+class UploadJob(Document):
+    resource: str
+    document_id: str
+    spool_path: str
+    filename: Optional[str] = None
+    content_type: str
+    size: int
+    sha256: str
+    status: Literal["queued", "running", "succeeded", "failed"] = "queued"
+    attempts: int = 0
+    error: Optional[str] = None
+    file_url: Optional[str] = None
+    lease_token: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+    available_at: Optional[datetime] = None
+    created_at: datetime = None
+    updated_at: datetime = None
+
+    class Settings:
+        name = "upload_jobs"
+        indexes = [
+            IndexModel(
+                [("status", ASCENDING), ("created_at", ASCENDING)],
+                name="status_queue",
+            ),
+        ]
+
+    def public_dump(self) -> dict:
+        return self.model_dump(
+            mode="json", exclude={"spool_path", "lease_token", "lease_expires_at"}
+        )
+
+    @before_event(Insert)
+    def set_created_at(self):
+        self.created_at = datetime.now(timezone.utc)
+        self.updated_at = datetime.now(timezone.utc)
+
+    @before_event(Replace, Save)
+    def set_updatd_at(self):
+        self.updated_at = datetime.now(timezone.utc)
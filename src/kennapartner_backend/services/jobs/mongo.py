@@ -0,0 +1,109 @@
+from beanie import PydanticObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument, ASCENDING
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import uuid
+from .base import JobQueue
+from .model import UploadJob
+
+
+"""
+Upload job queue stored in the `upload_jobs` collection.
+
+Jobs are claimed with a single `find_one_and_update`, so any number of
+workers, in any number of processes, can poll the same collection without
+handing a job out twice. Updates made after the claim are conditioned on
+the lease token, so a worker whose lease expired cannot overwrite the
+outcome of the worker that took the job over.
+
+A failed job is requeued with an `available_at` time that doubles with
+every attempt, so a failing storage backend is not retried immediately.
+
+Attributes:
+    lease (timedelta): How long a claimed or renewed job stays reserved.
+    max_attempts (int): Attempts before a job is marked failed.
+    backoff (timedelta): Delay before the first retry.
+"""
+class MongoJobQueue(JobQueue):
+    def __init__(
+        self,
+        lease: timedelta,
+        max_attempts: int = 3,
+        backoff: timedelta = timedelta(seconds=5),
+    ):
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+
+    async def enqueue(self, job: UploadJob) -> UploadJob:
+        return await job.insert()
+
+    async def claim(self) -> Optional[UploadJob]:
+        now = datetime.now(timezone.utc)
+        document = await UploadJob.get_motor_collection().find_one_and_update(
+            {
+                "$or": [
+                    # Also matches jobs without an available_at.
+                    {"status": "queued", "available_at": {"$not": {"$gt": now}}},
+                    {"status": "running", "lease_expires_at": {"$lt": now}},
+                ]
+            },
+            {
+                "$set": {
+                    "status": "running",
+                    "lease_token": uuid.uuid4().hex,
+                    "lease_expires_at": now + self.lease,
+                    "updated_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("created_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+        if document is None:
+            return None
+        return UploadJob.model_validate(document)
+
+    async def renew(self, job: UploadJob) -> bool:
+        now = datetime.now(timezone.utc)
+        result = await UploadJob.get_motor_collection().update_one(
+            {"_id": job.id, "lease_token": job.lease_token},
+            {"$set": {"lease_expires_at": now + self.lease, "updated_at": now}},
+        )
+        return result.matched_count == 1
+
+    async def complete(self, job: UploadJob, file_url: str):
+        await self.release(
+            job,
+            {"status": "succeeded", "file_url": file_url, "error": None},
+        )
+
+    async def fail(self, job: UploadJob, error: str, retry: bool = True) -> bool:
+        retry = retry and job.attempts < self.max_attempts
+        fields = {"status": "queued" if retry else "failed", "error": error}
+        if retry:
+            delay = self.backoff * 2 ** (job.attempts - 1)
+            fields["available_at"] = datetime.now(timezone.utc) + delay
+        await self.release(job, fields)
+        return retry
+
+    async def release(self, job: UploadJob, fields: dict):
+        await UploadJob.get_motor_collection().update_one(
+            {"_id": job.id, "lease_token": job.lease_token},
+            {
+                "$set": {
+                    **fields,
+                    "lease_token": None,
+                    "lease_expires_at": None,
+                    "updated_at": datetime.now(timezone.utc),
+                }
+            },
+        )
+
+    async def get(self, id: str) -> Optional[UploadJob]:
+        try:
+            id = PydanticObjectId(id)
+        except (InvalidId, TypeError):
+            return None
+        return await UploadJob.get(id)
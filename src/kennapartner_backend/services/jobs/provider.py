@@ -0,0 +1,84 @@
+from datetime import timedelta
+from typing import Optional
+import os
+from dotenv import load_dotenv
+from .base import JobQueue
+from .model import UploadJob
+from .mongo import MongoJobQueue
+from .spool import spool_file
+from .worker import UploadWorkerPool
+from ...dependencies.file_validation import ValidatedFile
+
+load_dotenv()
+
+
+"""
+Background upload jobs.
+
+Environment:
+    UPLOAD_JOB_WORKERS         Jobs run at the same time per process; 0
+                               disables the in-process workers (default: 2).
+    UPLOAD_JOB_LEASE           Seconds a claimed job is reserved; running jobs
+                               renew it every third of that (default: 300).
+    UPLOAD_JOB_MAX_ATTEMPTS    Attempts before a job fails (default: 3).
+    UPLOAD_JOB_BACKOFF         Seconds before the first retry of a failed job,
+                               doubled for every later one (default: 5).
+    UPLOAD_JOB_POLL_INTERVAL   Seconds between polls of an idle queue (default: 1).
+    UPLOAD_SPOOL_DIR           Where files wait for a worker (default: spool).
+"""
+
+SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR", "spool")
+LEASE = timedelta(seconds=float(os.getenv("UPLOAD_JOB_LEASE", 300)))
+
+_queue: Optional[JobQueue] = None
+_workers: Optional[UploadWorkerPool] = None
+
+
+def get_job_queue() -> JobQueue:
+    global _queue
+    if _queue is None:
+        _queue = MongoJobQueue(
+            lease=LEASE,
+            max_attempts=int(os.getenv("UPLOAD_JOB_MAX_ATTEMPTS", 3)),
+            backoff=timedelta(seconds=float(os.getenv("UPLOAD_JOB_BACKOFF", 5))),
+        )
+    return _queue
+
+
+async def enqueue_upload(resource: str, document_id, file: ValidatedFile) -> UploadJob:
+    job = await get_job_queue().enqueue(
+        UploadJob(
+            resource=resource,
+            document_id=str(document_id),
+            spool_path=await spool_file(SPOOL_DIR, file),
+            filename=file.filename,
+            content_type=file.content_type,
+            size=file.size,
+            sha256=file.sha256,
+        )
+    )
+    if _workers is not None:
+        _workers.notify()
+    return job
+
+
+def start_upload_workers():
+    global _workers
+    concurrency = int(os.getenv("UPLOAD_JOB_WORKERS", 2))
+    if _workers is not None or concurrency <= 0:
+        return
+
+    _workers = UploadWorkerPool(
+        get_job_queue(),
+        concurrency=concurrency,
+        poll_interval=float(os.getenv("UPLOAD_JOB_POLL_INTERVAL", 1)),
+        renew_interval=LEASE.total_seconds() / 3,
+    )
+    _workers.start()
+
+
+async def stop_upload_workers():
+    global _workers
+    if _workers is not None:
+        await _workers.stop()
+        _workers = None
@@ -0,0 +1,36 @@
+from typing import BinaryIO
+import asyncio
+import os
+import shutil
+import uuid
+from ...dependencies.file_validation import ValidatedFile
+
+
+"""
+Validated uploads waiting for a worker are kept on disk, not in the job
+document, so the queue stays small. The directory has to outlive worker
+restarts and, when several hosts run workers, be shared between them.
+"""
+
+
+async def spool_file(directory: str, file: ValidatedFile) -> str:
+    return await asyncio.to_thread(write_spool, directory, file.file)
+
+
+def write_spool(directory: str, file: BinaryIO) -> str:
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, uuid.uuid4().hex)
+
+    # Written under a temporary name and renamed, so a crash mid-copy never
+    # leaves a truncated file behind under a name a job points to.
+    with open(f"{path}.part", "wb") as spooled:
+        shutil.copyfileobj(file, spooled)
+    os.replace(f"{path}.part", path)
+    return path
+
+
+async def remove_spool(path: str):
+    try:
+        await asyncio.to_thread(os.remove, path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,121 @@
+from typing import List, Optional
+import asyncio
+from .base import JobQueue
+from .handlers import JobError, run_upload_job
+from .spool import remove_spool
+from ...utils import logger
+
+
+"""
+A pool of asyncio tasks, started with the application, that take upload
+jobs off the queue and run them.
+
+Idle workers poll the queue every `poll_interval` seconds; jobs enqueued by
+this process wake them immediately. While a job runs its lease is renewed
+every `renew_interval` seconds, so an upload that outlasts the lease is
+not handed to a second worker. On shutdown, jobs in flight get
+`shutdown_timeout` seconds to finish. A job cut off after that keeps its
+lease until it expires and is then picked up again by the next worker.
+
+Attributes:
+    queue (JobQueue): Where jobs are claimed from.
+    concurrency (int): Number of jobs run at the same time.
+    poll_interval (float): Seconds between polls of an idle queue.
+    renew_interval (float): Seconds between renewals of a running job's
+        lease; well under the lease itself.
+    shutdown_timeout (float): Seconds to wait for running jobs on stop.
+"""
+class UploadWorkerPool:
+    def __init__(
+        self,
+        queue: JobQueue,
+        concurrency: int = 2,
+        poll_interval: float = 1.0,
+        renew_interval: float = 60.0,
+        shutdown_timeout: float = 10.0,
+    ):
+        self.queue = queue
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.renew_interval = renew_interval
+        self.shutdown_timeout = shutdown_timeout
+        self.wakeup = asyncio.Event()
+        self.stopping = asyncio.Event()
+        self.tasks: List[asyncio.Task] = []
+
+    def start(self):
+        self.stopping.clear()
+        self.tasks = [
+            asyncio.create_task(self.work(), name=f"upload-worker-{index}")
+            for index in range(self.concurrency)
+        ]
+
+    async def stop(self):
+        self.stopping.set()
+        self.wakeup.set()
+        if not self.tasks:
+            return
+
+        _, pending = await asyncio.wait(self.tasks, timeout=self.shutdown_timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self.tasks = []
+
+    def notify(self):
+        self.wakeup.set()
+
+    async def work(self):
+        while not self.stopping.is_set():
+            try:
+                job = await self.queue.claim()
+            except Exception as error:
+                logger.error(f"Claiming upload job failed: {error}")
+                job = None
+
+            if job is None:
+                await self.idle()
+                continue
+
+            try:
+                await self.run(job)
+            except Exception as error:
+                logger.error(f"Upload job {job.id} could not be released: {error}")
+
+    async def idle(self):
+        try:
+            await asyncio.wait_for(self.wakeup.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+        self.wakeup.clear()
+
+    async def renew(self, job):
+        while True:
+            await asyncio.sleep(self.renew_interval)
+            try:
+                if not await self.queue.renew(job):
+                    logger.warning(f"Upload job {job.id} lost its lease")
+                    return
+            except Exception as error:
+                logger.error(f"Upload job {job.id} lease could not be renewed: {error}")
+
+    async def run_leased(self, job) -> str:
+        renewal = asyncio.create_task(self.renew(job))
+        try:
+            return await run_upload_job(job)
+        finally:
+            renewal.cancel()
+
+    async def run(self, job):
+        try:
+            file_url = await self.run_leased(job)
+        except JobError as error:
+            await self.queue.fail(job, str(error), retry=False)
+            await remove_spool(job.spool_path)
+            logger.error(f"Upload job {job.id} failed: {error}")
+        except Exception as error:
+            if not await self.queue.fail(job, str(error)):
+                await remove_spool(job.spool_path)
+            logger.error(f"Upload job {job.id} attempt {job.attempts} failed: {error}")
+        else:
+            await self.queue.complete(job, file_url)
@@ -0,0 +1,15 @@
+from .base import StorageBackend
+from .cloudinary import CloudinaryStorage
+from .local import LocalStorage
+from .model import StoredAsset
+from .provider import get_storage, close_storage
+from .variants import close_variant_pool
+from .assets import (
+    StoredFile,
+    acquire_file,
+    release_file,
+    release_files,
+    replace_file,
+    delete_and_release,
+    collect_orphaned_assets,
+)
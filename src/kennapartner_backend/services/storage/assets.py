@@ -0,0 +1,192 @@
+from beanie import Document
+from pymongo import ReturnDocument, UpdateOne
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+import time
+import uuid
+from .model import StoredAsset
+from .provider import get_storage
+from .variants import create_variants, delete_variants
+from ...dependencies.file_validation import ValidatedFile
+from ...utils import logger
+from ...utils.metrics import UPLOAD_BYTES, UPLOAD_DURATION
+from ...utils.timings import timed_phase
+
+
+"""
+Content-addressed, reference-counted file storage.
+
+Every stored file is recorded in the `stored_assets` collection under the
+SHA-256 of its content. Uploading content that is already stored only
+bumps the asset's reference count and reuses its URL, with no outbound
+transfer. Documents release their asset when the file is replaced or the
+document is deleted; assets nobody references any more are removed from
+storage by `collect_orphaned_assets`. Image variants are rendered and
+stored once per asset and share its lifetime.
+
+A document's reference moves with its `file_url`. The pointer is swapped
+with a single conditional update on the URL that was read, and the
+previous asset is released only by the request whose update matched, so
+overlapping uploads and deletes release every asset exactly once. A
+process that dies between acquiring an asset and swapping the pointer
+leaves one reference too many, which keeps the file rather than losing it.
+"""
+
+
+@dataclass
+class StoredFile:
+    url: str
+    variants: Dict[str, str] = field(default_factory=dict)
+
+
+async def acquire_file(file: ValidatedFile) -> StoredFile:
+    collection = StoredAsset.get_motor_collection()
+    now = datetime.now(timezone.utc)
+
+    asset = await collection.find_one_and_update(
+        {"sha256": file.sha256},
+        {"$inc": {"ref_count": 1}, "$set": {"updated_at": now}},
+        return_document=ReturnDocument.AFTER,
+    )
+    if asset:
+        return StoredFile(asset["url"], asset.get("variants", {}))
+
+    # Each transfer gets its own key, so garbage collection of an older
+    # copy of the same content can never delete this one.
+    key = f"{file.sha256}-{uuid.uuid4().hex[:8]}"
+    storage = get_storage()
+    started = time.perf_counter()
+    with timed_phase("upload"):
+        url = await storage.upload(file.file, file.content_type, key)
+    backend = type(storage).__name__
+    UPLOAD_DURATION.labels(backend).observe(time.perf_counter() - started)
+    UPLOAD_BYTES.labels(backend).observe(file.size)
+    with timed_phase("variants"):
+        variants = await create_variants(file.file, file.content_type, key)
+
+    asset = await collection.find_one_and_update(
+        {"sha256": file.sha256},
+        {
+            "$setOnInsert": {
+                "url": url,
+                "key": key,
+                "variants": variants,
+                "content_type": file.content_type,
+                "size": file.size,
+                "created_at": now,
+            },
+            "$inc": {"ref_count": 1},
+            "$set": {"updated_at": now},
+        },
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    if asset["key"] != key:
+        # A concurrent upload of the same content registered first.
+        await get_storage().delete(key, file.content_type)
+        await delete_variants(key, variants)
+    return StoredFile(asset["url"], asset.get("variants", {}))
+
+
+async def release_file(url: Optional[str]):
+    if not url:
+        return
+
+    await StoredAsset.get_motor_collection().update_one(
+        {"url": url},
+        {
+            "$inc": {"ref_count": -1},
+            "$set": {"updated_at": datetime.now(timezone.utc)},
+        },
+    )
+
+
+async def release_files(urls: List[Optional[str]]):
+    references = Counter(url for url in urls if url)
+    if not references:
+        return
+
+    now = datetime.now(timezone.utc)
+    await StoredAsset.get_motor_collection().bulk_write(
+        [
+            UpdateOne(
+                {"url": url},
+                {"$inc": {"ref_count": -count}, "$set": {"updated_at": now}},
+            )
+            for url, count in references.items()
+        ],
+        ordered=False,
+    )
+
+
+async def replace_file(document: Document, file: ValidatedFile) -> Optional[StoredFile]:
+    # Returns None, holding no reference, when the document was deleted.
+    stored = await acquire_file(file)
+    collection = type(document).get_motor_collection()
+    previous = document.file_url
+    try:
+        while True:
+            now = datetime.now(timezone.utc)
+            updated = await collection.find_one_and_update(
+                {"_id": document.id, "file_url": previous},
+                {
+                    "$set": {
+                        "file_url": stored.url,
+                        "file_variants": stored.variants,
+                        "updated_at": now,
+                    }
+                },
+                return_document=ReturnDocument.AFTER,
+            )
+            if updated is not None:
+                break
+
+            # Another upload swapped the file first; replace its file instead.
+            current = await collection.find_one({"_id": document.id}, {"file_url": 1})
+            if current is None:
+                await release_file(stored.url)
+                return None
+            previous = current.get("file_url")
+    except BaseException:
+        await release_file(stored.url)
+        raise
+
+    await release_file(previous)
+    document.file_url = stored.url
+    document.file_variants = stored.variants
+    document.updated_at = now
+    return stored
+
+
+async def delete_and_release(document: Document) -> bool:
+    # Only the request that removed the document releases its file.
+    deleted = await type(document).get_motor_collection().find_one_and_delete(
+        {"_id": document.id}, projection={"file_url": 1}
+    )
+    if deleted is None:
+        return False
+    await release_file(deleted.get("file_url"))
+    return True
+
+
+async def collect_orphaned_assets(grace: timedelta = timedelta(hours=1)) -> int:
+    collection = StoredAsset.get_motor_collection()
+    orphaned = {
+        "ref_count": {"$lte": 0},
+        "updated_at": {"$lt": datetime.now(timezone.utc) - grace},
+    }
+
+    collected = 0
+    async for asset in collection.find(orphaned, {"_id": 1}):
+        asset = await collection.find_one_and_delete({"_id": asset["_id"], **orphaned})
+        if asset is None:
+            continue
+
+        await get_storage().delete(asset["key"], asset["content_type"])
+        await delete_variants(asset["key"], asset.get("variants", {}))
+        collected += 1
+        logger.info(f"Collected orphaned asset {asset['key']}")
+
+    return collected
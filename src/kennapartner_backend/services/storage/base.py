@@ -0,0 +1,22 @@
+from typing import BinaryIO
+
+
+"""
+Interface implemented by the file storage backends.
+
+Methods:
+    upload(file, content_type, key): Store a file under `key` and return
+        its public URL.
+    delete(key, content_type): Remove a previously stored file; the type
+        it was uploaded with is given for backends that store types apart.
+    close(): Release pooled connections.
+"""
+class StorageBackend:
+    async def upload(self, file: BinaryIO, content_type: str, key: str) -> str:
+        raise NotImplementedError
+
+    async def delete(self, key: str, content_type: str):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
@@ -0,0 +1,136 @@
+import cloudinary
+import cloudinary.utils
+import httpx
+import asyncio
+import random
+import time
+import os
+from dotenv import load_dotenv
+from typing import BinaryIO, Optional
+from .base import StorageBackend
+from ...utils import logger
+
+load_dotenv()
+
+cloudinary.config(
+    cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
+    api_key=os.getenv("CLOUDINARY_API_KEY"),
+    api_secret=os.getenv("CLOUDINARY_API_SECRET"),
+    secure=True,
+)
+
+
+"""
+Cloudinary storage over an async, pooled HTTP client.
+
+Uploads go straight to the Cloudinary REST API through a keep-alive
+`httpx.AsyncClient`, so a slow transfer only suspends its own request.
+The file is read on a worker thread before the first attempt, since httpx
+would otherwise read it on the event loop while encoding the multipart
+body; retries send the same bytes.
+Concurrent transfers are capped by a semaphore, and transport errors,
+timeouts, 429s and 5xx responses are retried with exponential backoff and
+jitter.
+
+Cloudinary keeps images, videos and other files (such as PDFs) apart as
+resource types, and a file can only be destroyed under the type it was
+uploaded as, so both are derived from the file's content type.
+
+Attributes:
+    max_concurrency (int): Transfers allowed in flight at once.
+    max_retries (int): Retries after the first failed attempt.
+    backoff (float): Base delay in seconds, doubled on every retry.
+"""
+class CloudinaryStorage(StorageBackend):
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        timeout: float = 30,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+    ):
+        self.config = cloudinary.config()
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.slots = asyncio.Semaphore(max_concurrency)
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+            ),
+        )
+
+    async def upload(self, file: BinaryIO, content_type: str, key: str) -> str:
+        params = {"public_id": key, "overwrite": "true"}
+        file.seek(0)
+        data = await asyncio.to_thread(file.read)
+        response = await self.request(
+            resource_type(content_type), "upload", params, data, content_type
+        )
+        return response["secure_url"]
+
+    async def delete(self, key: str, content_type: str):
+        await self.request(
+            resource_type(content_type),
+            "destroy",
+            {"public_id": key, "invalidate": "true"},
+        )
+
+    async def request(
+        self,
+        resource_type: str,
+        action: str,
+        params: dict,
+        data: Optional[bytes] = None,
+        content_type: str = None,
+    ) -> dict:
+        url = cloudinary.utils.cloudinary_api_url(action, resource_type=resource_type)
+
+        async with self.slots:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    files = None
+                    if data is not None:
+                        files = {"file": (params["public_id"], data, content_type)}
+
+                    response = await self.client.post(
+                        url, data=self.sign(params), files=files
+                    )
+                    if response.status_code != 429 and response.status_code < 500:
+                        response.raise_for_status()
+                        return response.json()
+                    error = httpx.HTTPStatusError(
+                        f"Cloudinary responded {response.status_code}",
+                        request=response.request,
+                        response=response,
+                    )
+                except (httpx.TransportError, httpx.TimeoutException) as e:
+                    error = e
+
+                if attempt == self.max_retries:
+                    raise error
+
+                delay = self.backoff * 2**attempt * (1 + random.random())
+                logger.error(
+                    f"Cloudinary {action} failed, retrying in {delay:.2f}s: {error}"
+                )
+                await asyncio.sleep(delay)
+
+    def sign(self, params: dict) -> dict:
+        params = {**params, "timestamp": int(time.time())}
+        return {
+            **params,
+            "api_key": self.config.api_key,
+            "signature": cloudinary.utils.api_sign_request(
+                params, self.config.api_secret
+            ),
+        }
+
+    async def close(self):
+        await self.client.aclose()
+
+
+def resource_type(content_type: str) -> str:
+    kind = content_type.split("/", 1)[0]
+    return kind if kind in ("image", "video") else "raw"
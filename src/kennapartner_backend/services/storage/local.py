@@ -0,0 +1,40 @@
+import asyncio
+import glob
+import mimetypes
+import os
+import shutil
+from typing import BinaryIO
+from .base import StorageBackend
+
+
+"""
+Storage on the local filesystem.
+
+Files are copied into `root` on a worker thread and served from
+`base_url`. Besides small single-host deployments this is the stand-in
+used for tests and benchmarks, where no outbound transfer should happen.
+
+Attributes:
+    root (str): Directory files are written to.
+    base_url (str): URL prefix the directory is served from.
+"""
+class LocalStorage(StorageBackend):
+    def __init__(self, root: str = "media", base_url: str = "/media"):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+        os.makedirs(root, exist_ok=True)
+
+    async def upload(self, file: BinaryIO, content_type: str, key: str) -> str:
+        name = key + (mimetypes.guess_extension(content_type) or "")
+        await asyncio.to_thread(self.write, file, os.path.join(self.root, name))
+        return f"{self.base_url}/{name}"
+
+    async def delete(self, key: str, content_type: str):
+        pattern = os.path.join(glob.escape(self.root), glob.escape(key) + ".*")
+        for path in glob.glob(pattern):
+            await asyncio.to_thread(os.remove, path)
+
+    def write(self, file: BinaryIO, path: str):
+        file.seek(0)
+        with open(path, "wb") as destination:
+            shutil.copyfileobj(file, destination)
@@ -0,0 +1,27 @@
+from beanie import Document, Indexed, Insert, Replace, Save, before_event
+from datetime import datetime, timezone
+from typing import Annotated, Dict
+
+
+class StoredAsset(Document):
+    sha256: Annotated[str, Indexed(unique=True)]
+    url: Annotated[str, Indexed()]
+    key: str
+    content_type: str
+    size: int
+    variants: Dict[str, str] = {}
+    ref_count: int = 0
+    created_at: datetime = None
+    updated_at: datetime = None
+
+    class Settings:
+        name = "stored_assets"
+
+    @before_event(Insert)
+    def set_created_at(self):
+        self.created_at = datetime.now(timezone.utc)
+        self.updated_at = datetime.now(timezone.utc)
+
+    @before_event(Replace, Save)
+    def set_updatd_at(self):
+        self.updated_at = datetime.now(timezone.utc)
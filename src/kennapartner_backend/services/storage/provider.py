@@ -0,0 +1,52 @@
+from .base import StorageBackend
+from .cloudinary import CloudinaryStorage
+from .local import LocalStorage
+from typing import Optional
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+"""
+Application file storage.
+
+Environment:
+    STORAGE_BACKEND           "cloudinary" (default) or "local".
+    STORAGE_MAX_CONCURRENCY   Uploads in flight per worker (default: 8).
+    STORAGE_TIMEOUT           Per-request timeout in seconds (default: 30).
+    STORAGE_MAX_RETRIES       Retries on transient errors (default: 3).
+    STORAGE_BACKOFF           Base retry delay in seconds (default: 0.5).
+    STORAGE_LOCAL_ROOT        Directory used by the local backend (default: media).
+    STORAGE_LOCAL_BASE_URL    URL the local directory is served from (default: /media).
+"""
+
+_storage: Optional[StorageBackend] = None
+
+
+def create_storage() -> StorageBackend:
+    if os.getenv("STORAGE_BACKEND", "cloudinary") == "local":
+        return LocalStorage(
+            root=os.getenv("STORAGE_LOCAL_ROOT", "media"),
+            base_url=os.getenv("STORAGE_LOCAL_BASE_URL", "/media"),
+        )
+    return CloudinaryStorage(
+        max_concurrency=int(os.getenv("STORAGE_MAX_CONCURRENCY", 8)),
+        timeout=float(os.getenv("STORAGE_TIMEOUT", 30)),
+        max_retries=int(os.getenv("STORAGE_MAX_RETRIES", 3)),
+        backoff=float(os.getenv("STORAGE_BACKOFF", 0.5)),
+    )
+
+
+def get_storage() -> StorageBackend:
+    global _storage
+    if _storage is None:
+        _storage = create_storage()
+    return _storage
+
+
+async def close_storage():
+    global _storage
+    if _storage is not None:
+        await _storage.close()
+        _storage = None
@@ -0,0 +1,149 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, List, Optional
+import asyncio
+import io
+import multiprocessing
+import os
+from dotenv import load_dotenv
+from .provider import get_storage
+from ...utils import logger
+
+# Rendering lives in a module outside the package, so that the spawned
+# workers import it alone; see kennapartner_imaging.
+try:
+    from kennapartner_imaging import FORMATS, render_variants
+except ImportError:
+    from src.kennapartner_imaging import FORMATS, render_variants
+
+load_dotenv()
+
+
+"""
+Resized derivatives of uploaded images.
+
+Decoding, resizing and re-encoding are CPU bound, so they run in a pool of
+worker processes and the event loop only waits on the result. Each variant
+is stored next to the original under `<key>-<name>`. The workers are
+spawned rather than forked, so they do not inherit the event loop, the
+driver's sockets and threads or the log queue of the process serving
+requests, and they only import `kennapartner_imaging`. Without the optional
+`pillow` package images are stored without variants.
+
+Environment:
+    IMAGE_VARIANTS   Comma separated `name:max_width:format` entries
+                     (default: thumbnail:320:jpeg,medium:960:jpeg,webp:1920:webp).
+    IMAGE_WORKERS    Processes used to render variants (default: 2).
+    IMAGE_QUALITY    Encoder quality for JPEG and WebP (default: 80).
+"""
+
+SOURCE_TYPES = ("image/jpeg", "image/png", "image/webp")
+
+
+@dataclass(frozen=True)
+class VariantSpec:
+    name: str
+    max_width: int
+    format: str
+
+
+def parse_variants(value: str) -> List[VariantSpec]:
+    specs = []
+    for entry in filter(None, (part.strip() for part in value.split(","))):
+        name, max_width, format = entry.split(":")
+        if format not in FORMATS:
+            raise ValueError(f"Unsupported image variant format {format}")
+        specs.append(VariantSpec(name, int(max_width), format))
+    return specs
+
+
+VARIANTS = parse_variants(
+    os.getenv("IMAGE_VARIANTS", "thumbnail:320:jpeg,medium:960:jpeg,webp:1920:webp")
+)
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", 2))
+IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", 80))
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=IMAGE_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+
+def close_variant_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def variants_available() -> bool:
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def variant_key(key: str, name: str) -> str:
+    return f"{key}-{name}"
+
+
+"""
+Render the configured variants of an image and store each of them.
+
+Parameters:
+    file (BinaryIO): The original image.
+    content_type (str): Its sniffed content type.
+    key (str): Storage key of the original.
+
+Returns:
+    Dict[str, str]: Variant name to URL; empty for files that are not
+        images or when variants cannot be rendered.
+"""
+async def create_variants(
+    file: BinaryIO, content_type: str, key: str
+) -> Dict[str, str]:
+    if content_type not in SOURCE_TYPES or not VARIANTS:
+        return {}
+    if not variants_available():
+        logger.warning("Pillow is not installed, storing images without variants")
+        return {}
+
+    file.seek(0)
+    data = await asyncio.to_thread(file.read)
+    try:
+        rendered = await asyncio.get_running_loop().run_in_executor(
+            get_pool(),
+            render_variants,
+            data,
+            [(spec.name, spec.max_width, spec.format) for spec in VARIANTS],
+            IMAGE_QUALITY,
+        )
+    except Exception as error:
+        logger.error(f"Rendering variants of {key} failed: {error}")
+        return {}
+
+    urls = await asyncio.gather(
+        *(
+            get_storage().upload(io.BytesIO(body), type, variant_key(key, name))
+            for name, type, body in rendered
+        )
+    )
+    return {name: url for (name, _, _), url in zip(rendered, urls)}
+
+
+async def delete_variants(key: str, variants: Dict[str, str]):
+    # Variants named by an earlier IMAGE_VARIANTS are still images.
+    types = {spec.name: FORMATS[spec.format] for spec in VARIANTS}
+    await asyncio.gather(
+        *(
+            get_storage().delete(variant_key(key, name), types.get(name, "image/jpeg"))
+            for name in variants
+        )
+    )
@@ -1 +0,0 @@
-from .cloudinary import upload_file_to_cloudinary
\ No newline at end of file
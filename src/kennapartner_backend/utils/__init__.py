@@ -1,2 +1,14 @@
 from .logger import logger
-from .database import connect_to_database
\ No newline at end of file
+from .database import (
+    connect_to_database,
+    init_database,
+    close_database,
+    get_client,
+    transaction,
+)
+from .query_stats import (
+    QueryStats,
+    recorder,
+    record_queries,
+    assert_max_queries,
+)
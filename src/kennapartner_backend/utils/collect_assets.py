@@ -0,0 +1,45 @@
+"""
+Remove stored files that are no longer referenced by any document.
+
+Assets are only collected once they have been unreferenced for the grace
+period, so an upload that is about to reuse one is never left pointing at
+a deleted file.
+
+Usage:
+    poetry run collect-assets [--grace-minutes 60]
+"""
+
+from kennapartner_backend.utils import init_database, close_database, logger
+from kennapartner_backend.services.storage import collect_orphaned_assets, close_storage
+from datetime import timedelta
+import argparse
+import asyncio
+
+
+async def run(grace: timedelta):
+    await init_database()
+    try:
+        collected = await collect_orphaned_assets(grace)
+        logger.info(f"Collected {collected} orphaned assets")
+        print(f"Collected {collected} orphaned assets")
+    finally:
+        await close_storage()
+        await close_database()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Remove stored files no document references any more"
+    )
+    parser.add_argument(
+        "--grace-minutes",
+        type=int,
+        default=60,
+        help="How long an asset must have been unreferenced (default: 60)",
+    )
+    arguments = parser.parse_args()
+    asyncio.run(run(timedelta(minutes=arguments.grace_minutes)))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,28 +2,152 @@ from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo.errors import PyMongoError
 from dotenv import load_dotenv
 from beanie import init_beanie
+from contextlib import asynccontextmanager
+import asyncio
 
 
 load_dotenv()
 import os
 
 from .logger import logger
+from .query_stats import recorder
+from .metrics import metric_listeners
 
 
-async def connect_to_database():
+"""
+Application-lifetime database layer.
+
+A single pooled AsyncIOMotorClient is created when the application starts,
+the Beanie document models are initialised once against it and the client
+is closed when the application shuts down. The pool and driver behaviour
+can be tuned from the environment:
+
+    DATABASE_URI                         Connection string.
+    DATABASE_NAME                        Database name (default: Kennapatner).
+    DATABASE_MAX_POOL_SIZE               Maximum pooled connections (default: 100).
+    DATABASE_MIN_POOL_SIZE               Connections kept warm (default: 0).
+    DATABASE_MAX_IDLE_TIME_MS            Idle time before a connection is closed.
+    DATABASE_WAIT_QUEUE_TIMEOUT_MS       Maximum wait for a pooled connection.
+    DATABASE_CONNECT_TIMEOUT_MS          Socket connect timeout.
+    DATABASE_SOCKET_TIMEOUT_MS           Socket read/write timeout.
+    DATABASE_SERVER_SELECTION_TIMEOUT_MS Server selection timeout.
+    DATABASE_READ_PREFERENCE             e.g. primary, secondaryPreferred.
+    DATABASE_WRITE_CONCERN               e.g. majority, 1.
+    DATABASE_DROP_STALE_INDEXES          "true" to drop undeclared indexes.
+    DATABASE_TRANSACTIONS                "true" to wrap multi-document writes in a
+                                         transaction (requires a replica set).
+
+Indexes declared on each model's Settings are created during startup.
+Every command sent by the client is reported to the query stats recorder
+and, when prometheus-client is installed, to the command and pool metrics.
+"""
+
+DROP_STALE_INDEXES = os.getenv("DATABASE_DROP_STALE_INDEXES") == "true"
+USE_TRANSACTIONS = os.getenv("DATABASE_TRANSACTIONS") == "true"
+
+_client: AsyncIOMotorClient | None = None
+_lock = asyncio.Lock()
+
+_INT_OPTIONS = {
+    "maxPoolSize": "DATABASE_MAX_POOL_SIZE",
+    "minPoolSize": "DATABASE_MIN_POOL_SIZE",
+    "maxIdleTimeMS": "DATABASE_MAX_IDLE_TIME_MS",
+    "waitQueueTimeoutMS": "DATABASE_WAIT_QUEUE_TIMEOUT_MS",
+    "connectTimeoutMS": "DATABASE_CONNECT_TIMEOUT_MS",
+    "socketTimeoutMS": "DATABASE_SOCKET_TIMEOUT_MS",
+    "serverSelectionTimeoutMS": "DATABASE_SERVER_SELECTION_TIMEOUT_MS",
+}
+
+
+def get_client_options() -> dict:
+    options = {
+        "maxPoolSize": 100,
+        "event_listeners": [recorder, *metric_listeners()],
+    }
+    for option, variable in _INT_OPTIONS.items():
+        value = os.getenv(variable)
+        if value:
+            options[option] = int(value)
+
+    read_preference = os.getenv("DATABASE_READ_PREFERENCE")
+    if read_preference:
+        options["readPreference"] = read_preference
+
+    write_concern = os.getenv("DATABASE_WRITE_CONCERN")
+    if write_concern:
+        options["w"] = int(write_concern) if write_concern.isdigit() else write_concern
+
+    return options
+
+
+def get_document_models() -> list:
     from ..modules import User, Book, News, Insight, InsightAuthor
+    from ..services.storage import StoredAsset
+    from ..services.jobs import UploadJob
+
+    return [User, Book, News, Insight, InsightAuthor, StoredAsset, UploadJob]
+
+
+def get_client() -> AsyncIOMotorClient:
+    if _client is None:
+        raise RuntimeError("Database has not been initialised")
+    return _client
+
+
+async def init_database() -> AsyncIOMotorClient:
+    global _client
+
+    async with _lock:
+        if _client is not None:
+            return _client
+
+        try:
+            client = AsyncIOMotorClient(os.getenv("DATABASE_URI"), **get_client_options())
+            await init_beanie(
+                database=client[os.getenv("DATABASE_NAME", "Kennapatner")],
+                document_models=get_document_models(),
+                allow_index_dropping=DROP_STALE_INDEXES,
+            )
+            _client = client
+            logger.info("Database connected")
+
+        except PyMongoError as e:
+            logger.error(e)
+            raise
+
+        except Exception as e:
+            logger.error(e)
+            raise
+
+    return _client
+
+
+async def close_database():
+    global _client
+
+    async with _lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+            logger.info("Database connection closed")
+
+
+async def connect_to_database() -> AsyncIOMotorClient:
+    # Kept as a dependency for the existing route signatures; once the
+    # lifespan has initialised the client this is a cheap lookup.
+    if _client is not None:
+        return _client
+    return await init_database()
 
-    try:
-        client = AsyncIOMotorClient(os.getenv("DATABASE_URI"))
-        await init_beanie(
-            database=client.Kennapatner, document_models=[User, Book, News, Insight, InsightAuthor]
-        )
-        logger.info("Database connected")
 
-    except PyMongoError as e:
-        logger.error(e)
-        raise
+@asynccontextmanager
+async def transaction():
+    # Yields None when transactions are disabled so callers can pass the
+    # result straight through as the `session` of each write.
+    if not USE_TRANSACTIONS:
+        yield None
+        return
 
-    except Exception as e:
-        logger.error(e)
-        raise
+    async with await get_client().start_session() as session:
+        async with session.start_transaction():
+            yield session
@@ -0,0 +1,173 @@
+from kennapartner_backend.modules import User, Book, News, Insight, InsightAuthor
+from kennapartner_backend.modules.book import route as book_route
+from kennapartner_backend.modules.book.schema import SUMMARY_FIELDS as BOOK_FIELDS
+from kennapartner_backend.modules.news import route as news_route
+from kennapartner_backend.modules.news.schema import SUMMARY_FIELDS as NEWS_FIELDS
+from kennapartner_backend.modules.insight import route as insight_route
+from kennapartner_backend.modules.insight.schema import (
+    SUMMARY_FIELDS as INSIGHT_FIELDS,
+)
+from kennapartner_backend.utils import init_database, close_database
+from kennapartner_backend.helpers import (
+    encode_cursor,
+    page_pipeline,
+    search_collation,
+)
+from beanie import PydanticObjectId
+from datetime import datetime
+import asyncio
+import sys
+
+
+"""
+Explain every query the routes issue and fail if any of them is answered
+with a collection scan.
+
+List pages are explained as the aggregation `paginate()` runs: the route's
+own `list_filter` builds the match for each kind of listing (by year, by
+cursor, text and prefix search), `page_pipeline` adds the sort, the
+`$facet` of filtered pages and the projection of the summary fields, and
+prefix searches run with the collation of their index. The remaining
+shapes are the `find()` lookups of the detail, login and author routes;
+when a route gains a new one it should be added here so that the indexes
+declared on the models keep covering it.
+
+Usage:
+    poetry run explain
+"""
+
+LISTINGS = [
+    (Book, book_route, "date", BOOK_FIELDS),
+    (News, news_route, "created_at", NEWS_FIELDS),
+    (Insight, insight_route, "created_at", INSIGHT_FIELDS),
+]
+
+
+def listing_shapes(model, route, sort_field: str, fields) -> list:
+    cursor = encode_cursor(datetime(2024, 6, 1), PydanticObjectId())
+    shapes = [
+        ("list", {}),
+        ("list by year", {"year": "2024"}),
+        ("list by cursor", {"cursor": cursor}),
+        ("list by year, cursor", {"year": "2024", "cursor": cursor}),
+        ("text search", {"query": "kenna", "search": "text"}),
+        ("prefix search", {"query": "Ke", "search": "prefix"}),
+        (
+            "prefix search, cursor",
+            {"query": "Ke", "search": "prefix", "cursor": cursor},
+        ),
+    ]
+
+    pipelines = []
+    for description, params in shapes:
+        query_params = route.QueryParamsSchema(**params)
+        match = model.find(*route.list_filter(query_params)).get_filter_query()
+        ranked = bool(query_params.query) and query_params.search == "text"
+        pipeline = page_pipeline(
+            match,
+            "score" if ranked else sort_field,
+            query_params,
+            ranked=ranked,
+            fields={name: 1 for name in fields},
+        )
+        collation = search_collation(query_params.search, query_params.query)
+        pipelines.append((model, description, pipeline, collation))
+    return pipelines
+
+
+def pipeline_shapes() -> list:
+    return [
+        shape
+        for model, route, sort_field, fields in LISTINGS
+        for shape in listing_shapes(model, route, sort_field, fields)
+    ]
+
+
+def query_shapes() -> list:
+    return [
+        (Book, "lookup by name", {"name": "kenna"}),
+        (News, "lookup by title", {"title": "kenna"}),
+        (Insight, "lookup by title", {"title": "kenna"}),
+        (Book, "lookup by id", {"_id": PydanticObjectId()}),
+        (News, "lookup by id", {"_id": PydanticObjectId()}),
+        (Insight, "lookup by id", {"_id": PydanticObjectId()}),
+        (InsightAuthor, "lookup by email", {"email": "kenna@example.com"}),
+        (InsightAuthor, "lookup by id", {"_id": PydanticObjectId()}),
+        (User, "lookup by username", {"username": "kenna"}),
+        (User, "lookup by id", {"_id": PydanticObjectId()}),
+    ]
+
+
+def plan_stages(plan) -> list:
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(plan_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(plan_stages(value))
+    return stages
+
+
+def winning_plans(explanation) -> list:
+    # Depending on the server version and topology the planner output sits
+    # at the top, under the `$cursor` stage of the pipeline or per shard.
+    plans = []
+    if isinstance(explanation, dict):
+        for key, value in explanation.items():
+            if key == "winningPlan":
+                plans.append(value)
+            else:
+                plans.extend(winning_plans(value))
+    elif isinstance(explanation, list):
+        for value in explanation:
+            plans.extend(winning_plans(value))
+    return plans
+
+
+def report(model, description: str, explanation: dict) -> bool:
+    stages = plan_stages(winning_plans(explanation))
+    status = "FAIL" if "COLLSCAN" in stages or not stages else "OK"
+    print(
+        f"{status:<5}{model.get_collection_name():<18}{description:<24}"
+        f"{' > '.join(stages)}"
+    )
+    return status == "OK"
+
+
+async def explain_query_shapes() -> bool:
+    await init_database()
+
+    passed = True
+    for model, description, pipeline, collation in pipeline_shapes():
+        collection = model.get_motor_collection()
+        options = {"collation": collation} if collation else {}
+        explanation = await collection.database.command(
+            "aggregate", collection.name, pipeline=pipeline, explain=True, **options
+        )
+        passed = report(model, description, explanation) and passed
+
+    for model, description, filter in query_shapes():
+        cursor = model.get_motor_collection().find(filter)
+        explanation = await cursor.limit(10).explain()
+        passed = report(model, description, explanation) and passed
+
+    return passed
+
+
+async def run() -> bool:
+    try:
+        return await explain_query_shapes()
+    finally:
+        await close_database()
+
+
+def main():
+    if not asyncio.run(run()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
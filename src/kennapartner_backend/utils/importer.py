@@ -0,0 +1,329 @@
+from ..modules import Book, News, Insight
+from ..modules.book.schema import BookSchema
+from ..modules.news.schema import BookSchema as NewsSchema
+from ..modules.insight.schema import InsightSchema
+from ..modules.insight.authors import resolve_authors
+from ..helpers import invalidate_count
+from . import init_database, close_database, logger
+from pydantic import BaseModel, ValidationError
+from pymongo.errors import BulkWriteError
+from datetime import datetime, timezone
+from itertools import islice
+from typing import IO, Iterator, List, Optional, Tuple, Type, Union
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import sys
+import time
+
+
+"""
+Stream records from an NDJSON, CSV or JSON file (or stdin) into a
+collection.
+
+Records are read lazily, validated with the same schemas as the API and
+inserted with unordered `insert_many` batches, several batches in flight
+at a time. Invalid records, including NDJSON lines and CSV cells that are
+not valid JSON, are logged, counted and skipped; records that already
+exist (same name or title) are counted as duplicates.
+
+After every batch the number of records known to be written is saved to
+a checkpoint file. Running the same command again resumes after that
+record. Batches that finished beyond the checkpoint before a failure are
+simply reported as duplicates on the second run. The checkpoint is removed
+once an import completes, so the next import of the file starts over.
+
+Usage:
+    poetry run import books books.ndjson
+    poetry run import insights insights.json --batch-size 1000 --concurrency 8
+    cat news.csv | poetry run import news - --format csv --checkpoint news.ckpt
+"""
+
+RESOURCES = {
+    "books": (Book, BookSchema),
+    "news": (News, NewsSchema),
+    "insights": (Insight, InsightSchema),
+}
+
+# CSV columns holding nested values, which are written as JSON text.
+NESTED_COLUMNS = ("authors",)
+
+READ_SIZE = 64 * 1024
+
+
+def detect_format(source: str) -> str:
+    extension = os.path.splitext(source)[1].lstrip(".").lower()
+    if extension in ("csv", "json"):
+        return extension
+    return "ndjson"
+
+
+# A record that could not be decoded is yielded as its error, so that it
+# keeps its place in the numbering the checkpoint relies on and is counted
+# as invalid along with the records that fail validation.
+def read_ndjson(stream: IO[str]) -> Iterator[Union[dict, ValueError]]:
+    for line in stream:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as error:
+                yield error
+
+
+def read_csv(stream: IO[str]) -> Iterator[Union[dict, ValueError]]:
+    for row in csv.DictReader(stream):
+        try:
+            for key in NESTED_COLUMNS:
+                if row.get(key):
+                    row[key] = json.loads(row[key])
+        except ValueError as error:
+            yield error
+        else:
+            yield row
+
+
+def read_json(stream: IO[str]) -> Iterator[dict]:
+    # Decodes the elements of a top level array one at a time, so the file
+    # never has to fit in memory.
+    decoder = json.JSONDecoder()
+    buffer = ""
+    started = False
+    while True:
+        chunk = stream.read(READ_SIZE)
+        buffer += chunk
+        while True:
+            buffer = buffer.lstrip()
+            if not started:
+                if not buffer:
+                    break
+                if buffer[0] != "[":
+                    raise ValueError("JSON input must be an array of records")
+                buffer = buffer[1:]
+                started = True
+                continue
+            buffer = buffer.lstrip(",").lstrip()
+            if buffer.startswith("]"):
+                return
+            try:
+                record, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                break
+            buffer = buffer[end:]
+            yield record
+        if not chunk:
+            if buffer.strip():
+                raise ValueError("JSON input ended before the closing bracket")
+            return
+
+
+READERS = {"ndjson": read_ndjson, "csv": read_csv, "json": read_json}
+
+
+def load_checkpoint(path: Optional[str]) -> int:
+    if not path or not os.path.exists(path):
+        return 0
+    with open(path) as checkpoint:
+        return json.load(checkpoint)["records"]
+
+
+def save_checkpoint(path: Optional[str], records: int):
+    if not path:
+        return
+    with open(f"{path}.part", "w") as checkpoint:
+        json.dump({"records": records}, checkpoint)
+    os.replace(f"{path}.part", path)
+
+
+def clear_checkpoint(path: Optional[str]):
+    if path and os.path.exists(path):
+        os.remove(path)
+
+
+async def build_documents(
+    model, schema: Type[BaseModel], records: List[Tuple[int, dict]]
+):
+    valid = []
+    for number, record in records:
+        if isinstance(record, ValueError):
+            logger.error(f"Record {number} could not be decoded: {record}")
+            continue
+        try:
+            valid.append(schema.model_validate(record))
+        except ValidationError as error:
+            logger.error(f"Record {number} is invalid: {error}")
+
+    if model is Insight:
+        authors = {
+            author.email: author
+            for author in await resolve_authors(
+                [author for item in valid for author in item.authors]
+            )
+        }
+        documents = [
+            Insight(
+                title=item.title,
+                content=item.content,
+                authors=[
+                    authors[email]
+                    for email in dict.fromkeys(author.email for author in item.authors)
+                ],
+            )
+            for item in valid
+        ]
+    else:
+        documents = [model(**item.model_dump()) for item in valid]
+
+    now = datetime.now(timezone.utc)
+    for document in documents:
+        document.created_at = now
+        document.updated_at = now
+    return documents, len(records) - len(valid)
+
+
+"""
+Import progress shared by the batches in flight.
+
+Batches finish out of order, so the checkpoint only advances to the end
+of the longest run of finished batches that starts at the previous
+checkpoint.
+"""
+class Progress:
+    def __init__(self, checkpoint: Optional[str], start: int):
+        self.checkpoint = checkpoint
+        self.committed = start
+        self.finished = {}
+        self.inserted = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.started_at = time.monotonic()
+
+    def finish(self, start: int, end: int):
+        self.finished[start] = end
+        while self.committed in self.finished:
+            self.committed = self.finished.pop(self.committed)
+        save_checkpoint(self.checkpoint, self.committed)
+
+    def report(self) -> str:
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        return (
+            f"{self.inserted} inserted, {self.duplicates} duplicates, "
+            f"{self.invalid} invalid, {self.inserted / elapsed:.0f} docs/sec"
+        )
+
+
+async def import_batch(
+    model,
+    schema: Type[BaseModel],
+    batch: List[Tuple[int, dict]],
+    progress: Progress,
+):
+    documents, invalid = await build_documents(model, schema, batch)
+    inserted, duplicates = len(documents), 0
+    if documents:
+        try:
+            await model.insert_many(documents, ordered=False)
+        except BulkWriteError as error:
+            errors = error.details["writeErrors"]
+            if any(failure.get("code") != 11000 for failure in errors):
+                raise
+            duplicates = len(errors)
+            inserted -= duplicates
+
+    progress.inserted += inserted
+    progress.duplicates += duplicates
+    progress.invalid += invalid
+    progress.finish(batch[0][0], batch[-1][0] + 1)
+    print(progress.report(), file=sys.stderr)
+
+
+async def run(
+    resource: str,
+    stream: IO[str],
+    format: str,
+    batch_size: int,
+    concurrency: int,
+    checkpoint: Optional[str],
+):
+    model, schema = RESOURCES[resource]
+    start = load_checkpoint(checkpoint)
+    records = islice(enumerate(READERS[format](stream)), start, None)
+    progress = Progress(checkpoint, start)
+    if start:
+        print(f"Resuming after record {start}", file=sys.stderr)
+
+    await init_database()
+    slots = asyncio.Semaphore(concurrency)
+    tasks = set()
+
+    async def guarded(batch):
+        try:
+            await import_batch(model, schema, batch, progress)
+        finally:
+            slots.release()
+
+    try:
+        while True:
+            await slots.acquire()
+            # Parsing is synchronous; doing it on a thread keeps the batches
+            # already in flight moving.
+            batch = await asyncio.to_thread(list, islice(records, batch_size))
+            if not batch:
+                slots.release()
+                break
+            tasks.add(asyncio.create_task(guarded(batch)))
+            # Surface the first failure instead of reading the whole input.
+            for done in [task for task in tasks if task.done()]:
+                tasks.discard(done)
+                done.result()
+
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        invalidate_count(model)
+        await close_database()
+
+    clear_checkpoint(checkpoint)
+    print(f"Imported {resource}: {progress.report()}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import records into a collection")
+    parser.add_argument("resource", choices=sorted(RESOURCES))
+    parser.add_argument(
+        "source", nargs="?", default="-", help="File path or - for stdin"
+    )
+    parser.add_argument("--format", choices=sorted(READERS))
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--checkpoint", help="Progress file used to resume an import")
+    arguments = parser.parse_args()
+
+    format = arguments.format or detect_format(arguments.source)
+    checkpoint = arguments.checkpoint
+    if checkpoint is None and arguments.source != "-":
+        checkpoint = f"{arguments.source}.checkpoint"
+
+    if arguments.source == "-":
+        stream = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8")
+    else:
+        stream = open(arguments.source, encoding="utf-8", newline="")
+
+    with stream:
+        asyncio.run(
+            run(
+                arguments.resource,
+                stream,
+                format,
+                arguments.batch_size,
+                arguments.concurrency,
+                checkpoint,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,149 @@
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener, WatchedFileHandler
+from typing import Optional
+import atexit
+import copy
+import json
 import logging
 import os
+import queue
+import random
+from dotenv import load_dotenv
 
-log_dir = "log"
+load_dotenv()
+
+
+"""
+Application logger.
+
+Messages are rendered on the calling thread and handed to a bounded queue;
+a QueueListener thread appends them to the log files, so logging never
+waits on the disk. When the queue is full, records are dropped instead of
+blocking the request that logged them, and the number of dropped records
+is reported with the next one that gets through.
+
+Each line is a JSON object. Records logged while a request is handled
+carry its `request_id` and `route` (see RequestContextMiddleware); extra
+fields passed with `extra=` are included as they are, e.g. `latency_ms`.
+Records below WARNING can be sampled.
+
+Every worker process opens the same files in append mode, so each line is
+written whole. The files are not rotated here, since a process renaming
+them would leave the others writing to the old file; rotate them with an
+external tool such as logrotate, without copytruncate, and the handlers
+reopen them once they have been moved.
+
+Environment:
+    LOG_DIR                Directory of app.log and error.log (default: log).
+    LOG_LEVEL              Lowest level written (default: INFO).
+    LOG_QUEUE_SIZE         Records waiting to be written (default: 10000).
+    LOG_INFO_SAMPLE_RATE   Fraction of records below WARNING kept (default: 1).
+"""
+
+log_dir = os.getenv("LOG_DIR", "log")
 os.makedirs(log_dir, exist_ok=True)
 
 app_log_path = os.path.join(log_dir, "app.log")
 error_log_path = os.path.join(log_dir, "error.log")
 
-formatter = logging.Formatter(
-    "[%(asctime)s] [%(levelname)s] - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
-)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+LOG_INFO_SAMPLE_RATE = float(os.getenv("LOG_INFO_SAMPLE_RATE", 1))
 
-app_handler = logging.FileHandler(app_log_path)
-app_handler.setLevel(logging.INFO)
-app_handler.setFormatter(formatter)
+# The ASGI scope of the request being handled; the route is read from it
+# when a record is made, since it is only known once the router has run.
+request_scope: ContextVar[Optional[dict]] = ContextVar("request_scope", default=None)
+
+RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S%z"),
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRIBUTES and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        scope = request_scope.get()
+        if scope is not None:
+            record.request_id = scope.get("request_id")
+            route = scope.get("route")
+            record.route = route.path if route is not None else scope.get("path")
+        return True
 
 
-error_handler = logging.FileHandler(app_log_path)
+class SamplingFilter(logging.Filter):
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+class DroppingQueueHandler(QueueHandler):
+    def __init__(self, records: queue.Queue):
+        super().__init__(records)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Arguments and tracebacks are rendered here, on the calling thread,
+        # but the record stays structured for the JSON formatter.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        if self.dropped:
+            record.dropped_records = self.dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+        else:
+            self.dropped = 0
+
+
+formatter = JSONFormatter()
+
+app_handler = WatchedFileHandler(app_log_path)
+app_handler.setLevel(LOG_LEVEL)
+app_handler.setFormatter(formatter)
+
+error_handler = WatchedFileHandler(error_log_path)
 error_handler.setLevel(logging.ERROR)
 error_handler.setFormatter(formatter)
 
+queue_handler = DroppingQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+queue_handler.addFilter(SamplingFilter(LOG_INFO_SAMPLE_RATE))
+queue_handler.addFilter(RequestContextFilter())
+
+listener = QueueListener(
+    queue_handler.queue, app_handler, error_handler, respect_handler_level=True
+)
+
 logger = logging.getLogger("my_logger")
-logger.setLevel(logging.DEBUG)
+logger.setLevel(LOG_LEVEL)
 
-if not logger.hasHandlers():
-    logger.addHandler(app_handler)
-    logger.addHandler(error_handler)
\ No newline at end of file
+# hasHandlers() would also see handlers on the root logger, e.g. those
+# installed by a test runner, and leave this logger without its own.
+if not logger.handlers:
+    logger.addHandler(queue_handler)
+    listener.start()
+    atexit.register(listener.stop)
@@ -0,0 +1,217 @@
+from pymongo import monitoring
+from typing import Tuple
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:
+    prometheus_client = None
+
+
+"""
+Prometheus metrics of the API, the database driver and the slow paths.
+
+Collectors are created at import time and are no-ops when the optional
+`prometheus-client` package is not installed, so call sites never need to
+check. The driver listeners are registered on the application client and
+report command durations and connection pool checkouts.
+
+With several uvicorn workers every process keeps its own counters; setting
+PROMETHEUS_MULTIPROC_DIR makes them write to shared files that `/metrics`
+aggregates, whichever worker answers. The directory must exist and be
+emptied before the server starts.
+
+Environment:
+    PROMETHEUS_MULTIPROC_DIR    Shared directory for multi-process mode.
+"""
+
+MULTIPROCESS_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+BCRYPT_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 2)
+SIZE_BUCKETS = (16e3, 64e3, 256e3, 1e6, 2e6, 5e6, 10e6, 20e6)
+
+
+class _Disabled:
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount: float = 1):
+        pass
+
+    def dec(self, amount: float = 1):
+        pass
+
+    def observe(self, value: float):
+        pass
+
+
+def metrics_available() -> bool:
+    return prometheus_client is not None
+
+
+def metric(kind: str, name: str, documentation: str, labels=(), **options):
+    if prometheus_client is None:
+        return _Disabled()
+    return getattr(prometheus_client, kind)(name, documentation, labels, **options)
+
+
+REQUESTS = metric(
+    "Counter",
+    "http_requests",
+    "Responses by route and status",
+    ["method", "route", "status"],
+)
+REQUEST_DURATION = metric(
+    "Histogram",
+    "http_request_duration_seconds",
+    "Time to the end of the response body",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_PROGRESS = metric(
+    "Gauge",
+    "http_requests_in_progress",
+    "Requests being handled",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+DB_COMMAND_DURATION = metric(
+    "Histogram",
+    "mongodb_command_duration_seconds",
+    "Round trip of each database command",
+    ["command"],
+    buckets=DB_BUCKETS,
+)
+DB_COMMAND_FAILURES = metric(
+    "Counter", "mongodb_command_failures", "Failed database commands", ["command"]
+)
+DB_POOL_CHECKOUT_WAIT = metric(
+    "Histogram",
+    "mongodb_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection",
+    buckets=DB_BUCKETS,
+)
+DB_POOL_CHECKOUT_FAILURES = metric(
+    "Counter",
+    "mongodb_pool_checkout_failures",
+    "Connection checkouts that failed",
+    ["reason"],
+)
+DB_POOL_CONNECTIONS = metric(
+    "Gauge",
+    "mongodb_pool_connections",
+    "Open pooled connections",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKED_OUT = metric(
+    "Gauge",
+    "mongodb_pool_checked_out",
+    "Pooled connections in use",
+    multiprocess_mode="livesum",
+)
+UPLOAD_DURATION = metric(
+    "Histogram",
+    "upload_duration_seconds",
+    "Transfer of an uploaded file to storage",
+    ["backend"],
+    buckets=LATENCY_BUCKETS,
+)
+UPLOAD_BYTES = metric(
+    "Histogram",
+    "upload_size_bytes",
+    "Size of uploaded files",
+    ["backend"],
+    buckets=SIZE_BUCKETS,
+)
+PASSWORD_VERIFY_DURATION = metric(
+    "Histogram",
+    "password_verify_duration_seconds",
+    "bcrypt password checks, excluding the wait for a slot",
+    buckets=BCRYPT_BUCKETS,
+)
+TOKEN_CACHE_LOOKUPS = metric(
+    "Counter", "token_cache_lookups", "Access token cache lookups", ["result"]
+)
+
+
+class CommandMetrics(monitoring.CommandListener):
+    def started(self, event: monitoring.CommandStartedEvent):
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        DB_COMMAND_DURATION.labels(event.command_name).observe(
+            event.duration_micros / 1e6
+        )
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        DB_COMMAND_DURATION.labels(event.command_name).observe(
+            event.duration_micros / 1e6
+        )
+        DB_COMMAND_FAILURES.labels(event.command_name).inc()
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        DB_POOL_CONNECTIONS.inc()
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        DB_POOL_CONNECTIONS.dec()
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        DB_POOL_CHECKOUT_FAILURES.labels(event.reason).inc()
+
+    def connection_checked_out(self, event):
+        DB_POOL_CHECKED_OUT.inc()
+        # Older drivers do not report how long the checkout took.
+        duration = getattr(event, "duration", None)
+        if duration is not None:
+            DB_POOL_CHECKOUT_WAIT.observe(duration)
+
+    def connection_checked_in(self, event):
+        DB_POOL_CHECKED_OUT.dec()
+
+
+def metric_listeners() -> list:
+    if prometheus_client is None:
+        return []
+    return [CommandMetrics(), PoolMetrics()]
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    if MULTIPROCESS_DIR:
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    content = prometheus_client.generate_latest(registry)
+    return content, prometheus_client.CONTENT_TYPE_LATEST
+
+
+def close_metrics():
+    # Drops the live gauges of this worker from the shared files.
+    if prometheus_client is not None and MULTIPROCESS_DIR:
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,136 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pymongo import monitoring
+from typing import Dict, Iterator, List, Optional, Tuple
+import threading
+
+
+"""
+Per-request record of the database commands the driver sends.
+
+`recorder` is registered as a pymongo CommandListener on the application
+client. Every command that completes while a `QueryStats` is active in the
+current context is appended to it, together with its collection and
+duration. Motor runs pymongo calls on executor threads with a copy of the
+caller's context, so commands are attributed to the request or test that
+awaited them.
+
+`record_queries()` and `assert_max_queries()` activate a recording for the
+enclosed block; recordings nest, so a test can pin the round trips of a
+request that the query stats middleware is also recording.
+
+    with assert_max_queries(3):
+        await client.get("/api/v1/insights/")
+"""
+
+
+@dataclass
+class Command:
+    name: str
+    collection: Optional[str]
+    duration: float
+    failed: bool = False
+
+
+@dataclass
+class QueryStats:
+    commands: List[Command] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.commands)
+
+    @property
+    def duration(self) -> float:
+        return sum(command.duration for command in self.commands)
+
+    def describe(self) -> str:
+        return "\n".join(
+            f"  {command.name} {command.collection or ''} "
+            f"{command.duration * 1000:.2f} ms{' (failed)' if command.failed else ''}"
+            for command in self.commands
+        )
+
+
+@dataclass
+class RouteStats:
+    requests: int = 0
+    commands: int = 0
+    duration: float = 0.0
+    max_commands: int = 0
+
+
+_active: ContextVar[Tuple[QueryStats, ...]] = ContextVar("query_stats", default=())
+
+
+class CommandRecorder(monitoring.CommandListener):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[tuple, tuple] = {}
+        self.routes: Dict[str, RouteStats] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        active = _active.get()
+        if not active:
+            return
+        collection = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            collection = event.command.get("collection")
+        if not isinstance(collection, str):
+            collection = None
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (
+                active,
+                collection,
+            )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        self._finish(event, failed=False)
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed: bool):
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        active, collection = pending
+        command = Command(
+            event.command_name, collection, event.duration_micros / 1e6, failed
+        )
+        for stats in active:
+            stats.commands.append(command)
+
+    def add_route(self, route: str, stats: QueryStats):
+        with self._lock:
+            totals = self.routes.setdefault(route, RouteStats())
+            totals.requests += 1
+            totals.commands += stats.count
+            totals.duration += stats.duration
+            totals.max_commands = max(totals.max_commands, stats.count)
+
+
+recorder = CommandRecorder()
+
+
+@contextmanager
+def record_queries() -> Iterator[QueryStats]:
+    stats = QueryStats()
+    token = _active.set(_active.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryStats]:
+    with record_queries() as stats:
+        yield stats
+    if stats.count > limit:
+        raise AssertionError(
+            f"Expected at most {limit} database commands, "
+            f"{stats.count} were issued:\n{stats.describe()}"
+        )
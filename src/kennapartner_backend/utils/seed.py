@@ -1,6 +1,6 @@
 from kennapartner_backend.modules import User
-from kennapartner_backend.utils import connect_to_database
-import bcrypt
+from kennapartner_backend.utils import connect_to_database, close_database
+from kennapartner_backend.helpers import hash_password
 import asyncio
 from datetime import timezone, datetime
 from kennapartner_backend.utils import logger
@@ -9,31 +9,36 @@ from kennapartner_backend.utils import logger
 async def seed_user():
     await connect_to_database()
 
+    # Hashing runs on worker threads, so both passwords are hashed at once.
+    passwords = await asyncio.gather(
+        hash_password("secure_pass_123"), hash_password("secure_pass_456")
+    )
+    now = datetime.now(timezone.utc)
     users = await User.insert_many(
         [
             User(
-                username="kenna_admin_123",
-                password=bcrypt.hashpw(
-                    "secure_pass_123".encode("utf-8"), bcrypt.gensalt()
-                ),
-                created_at=datetime.now(timezone.utc),
-                updated_at=datetime.now(timezone.utc),
-            ),
-            User(
-                username="kenna_admin_456",
-                password=bcrypt.hashpw(
-                    "secure_pass_456".encode("utf-8"), bcrypt.gensalt()
-                ),
-                created_at=datetime.now(timezone.utc),
-                updated_at=datetime.now(timezone.utc),
-            ),
+                username=username,
+                password=password,
+                created_at=now,
+                updated_at=now,
+            )
+            for username, password in zip(
+                ["kenna_admin_123", "kenna_admin_456"], passwords
+            )
         ]
     )
     return users
 
 
+async def run():
+    try:
+        await seed_user()
+    finally:
+        await close_database()
+
+
 def main():
-    asyncio.run(seed_user())
+    asyncio.run(run())
 
 
 if __name__ == "__main__":
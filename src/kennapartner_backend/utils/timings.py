@@ -0,0 +1,50 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, Optional
+import time
+
+
+"""
+Where the time of the current request goes.
+
+The request timing middleware activates a `RequestTimings` for each
+request; the code on the slow paths reports into it with `timed_phase`
+(serialisation, storage uploads, password checks) and the route class
+marks when dependency resolution ended and the endpoint started. Outside
+a request, e.g. in the upload workers, reporting is a no-op.
+"""
+
+
+@dataclass
+class RequestTimings:
+    started: float = field(default_factory=time.perf_counter)
+    endpoint_started: Optional[float] = None
+    phases: Dict[str, float] = field(default_factory=dict)
+
+    def add(self, phase: str, seconds: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar(
+    "request_timings", default=None
+)
+
+
+@contextmanager
+def timed_phase(phase: str) -> Iterator[None]:
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - started)
+
+
+def mark_endpoint_started():
+    timings = current_timings.get()
+    if timings is not None and timings.endpoint_started is None:
+        timings.endpoint_started = time.perf_counter()
@@ -0,0 +1,41 @@
+"""
+Image variant rendering run in the worker processes of the variant pool.
+
+Kept outside the `kennapartner_backend` package on purpose: a spawned
+worker imports this module to unpickle the job, and importing anything
+under the package would load the routers, the storage configuration and
+the application logger, whose file handlers must stay in the serving
+process. Only the standard library and Pillow are used here, and nothing
+happens on import.
+"""
+
+from typing import List, Tuple
+import io
+
+FORMATS = {"jpeg": "image/jpeg", "png": "image/png", "webp": "image/webp"}
+
+
+def render_variants(
+    data: bytes, specs: List[Tuple[str, int, str]], quality: int
+) -> List[Tuple[str, str, bytes]]:
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        image.load()
+
+    rendered = []
+    for name, max_width, format in specs:
+        variant = image.copy()
+        variant.thumbnail((max_width, max_width * 4), Image.Resampling.LANCZOS)
+        if format == "jpeg" and variant.mode != "RGB":
+            # JPEG has no alpha channel; flatten onto white.
+            variant = variant.convert("RGBA")
+            background = Image.new("RGB", variant.size, (255, 255, 255))
+            background.paste(variant, mask=variant.getchannel("A"))
+            variant = background
+
+        output = io.BytesIO()
+        variant.save(output, format=format.upper(), quality=quality, optimize=True)
+        rendered.append((name, FORMATS[format], output.getvalue()))
+    return rendered
@@ -0,0 +1,89 @@
+"""
+Shared fixtures.
+
+`client` boots `main.app` through its lifespan and drives it over httpx's
+ASGI transport. It needs a real MongoDB server, given as TEST_DATABASE_URI,
+because the commands are counted by the driver's command listener; tests
+using it are skipped when the variable is not set. A scratch database,
+TEST_DATABASE_NAME, is created for each test and dropped afterwards.
+
+Async tests run on anyio's pytest plugin (mark them with
+`pytest.mark.anyio`). `assert_max_queries` pins the database round trips
+of a block, usually one request:
+
+    async def test_list_insights(client, assert_max_queries):
+        with assert_max_queries(3):
+            response = await client.get("/api/v1/insights/")
+
+Environment:
+    TEST_DATABASE_URI     MongoDB server used by the tests.
+    TEST_DATABASE_NAME    Scratch database (default: kennapartner_test).
+"""
+
+import os
+import tempfile
+
+TEST_DATABASE_URI = os.getenv("TEST_DATABASE_URI")
+TEST_DATABASE_NAME = os.getenv("TEST_DATABASE_NAME", "kennapartner_test")
+
+# Settings are read when the application modules are imported, so they are
+# pinned before anything from the application is loaded. The caches are
+# disabled so that every request reaches the database.
+scratch = tempfile.mkdtemp(prefix="kennapartner-tests-")
+os.environ["STORAGE_BACKEND"] = "local"
+os.environ["STORAGE_LOCAL_ROOT"] = os.path.join(scratch, "media")
+os.environ["UPLOAD_SPOOL_DIR"] = os.path.join(scratch, "spool")
+os.environ["LOG_DIR"] = os.path.join(scratch, "log")
+os.environ["DATABASE_NAME"] = TEST_DATABASE_NAME
+os.environ["RESPONSE_CACHE_TTL"] = "0"
+os.environ["COUNT_CACHE_TTL"] = "0"
+os.environ["TOKEN_CACHE_TTL"] = "0"
+os.environ.setdefault("JWT_SECRET", "test-secret-" + "x" * 32)
+if TEST_DATABASE_URI:
+    os.environ["DATABASE_URI"] = TEST_DATABASE_URI
+
+import httpx
+import pytest
+from src.kennapartner_backend.modules import User
+from src.kennapartner_backend.helpers import create_tokens, hash_password
+from src.kennapartner_backend.utils import assert_max_queries as max_queries
+from src.kennapartner_backend.utils import connect_to_database
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def app():
+    if not TEST_DATABASE_URI:
+        pytest.skip("TEST_DATABASE_URI is not set")
+
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        try:
+            yield app
+        finally:
+            client = await connect_to_database()
+            await client.drop_database(TEST_DATABASE_NAME)
+
+
+@pytest.fixture
+async def client(app):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+async def auth_headers(client):
+    user = User(username="tester", password=await hash_password("tester_pass_123"))
+    await user.insert()
+    return {"Authorization": f"Bearer {create_tokens(str(user.id))[0]}"}
+
+
+@pytest.fixture
+def assert_max_queries():
+    return max_queries
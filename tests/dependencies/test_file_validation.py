@@ -0,0 +1,34 @@
+"""
+Content types sniffed from the first bytes of an upload.
+"""
+
+import pytest
+from src.kennapartner_backend.dependencies.file_validation import sniff_content_type
+
+
+@pytest.mark.parametrize(
+    "head, content_type",
+    [
+        (b"\xff\xd8\xff\xe0\x00\x10JFIF", "image/jpeg"),
+        (b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR", "image/png"),
+        (b"RIFF\x24\x00\x00\x00WEBPVP8 ", "image/webp"),
+        (b"GIF89a\x01\x00", "image/gif"),
+        (b"%PDF-1.7\n", "application/pdf"),
+    ],
+)
+def test_known_signatures(head, content_type):
+    assert sniff_content_type(head) == content_type
+
+
+@pytest.mark.parametrize(
+    "head",
+    [
+        b"",
+        b"<svg xmlns='http://www.w3.org/2000/svg'/>",
+        # A RIFF container that is not WebP, e.g. a WAV file.
+        b"RIFF\x24\x00\x00\x00WAVEfmt ",
+        b"\x89PNG",
+    ],
+)
+def test_unknown_content(head):
+    assert sniff_content_type(head) is None
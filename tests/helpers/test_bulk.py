@@ -0,0 +1,58 @@
+"""
+Per-item results of the bulk endpoints and the size limit of their bodies.
+"""
+
+from beanie import PydanticObjectId
+from fastapi import HTTPException
+import pytest
+from src.kennapartner_backend.helpers import bulk
+from src.kennapartner_backend.helpers.bulk import (
+    BulkDeleteSchema,
+    item_result,
+    parse_id,
+    write_failure,
+)
+
+ID = PydanticObjectId("6650c0ffee0000000000abcd")
+
+
+def test_item_result():
+    assert item_result(0, 201, id=ID) == {
+        "index": 0,
+        "status": 201,
+        "id": "6650c0ffee0000000000abcd",
+    }
+    assert item_result(1, 400, message="Invalid id") == {
+        "index": 1,
+        "status": 400,
+        "message": "Invalid id",
+    }
+
+
+def test_duplicate_key_failure():
+    failure = {"index": 0, "code": 11000, "errmsg": "E11000 duplicate key"}
+    assert write_failure(failure, "Book") == (409, "Book already exist")
+
+
+def test_other_write_failure():
+    failure = {"index": 0, "code": 121, "errmsg": "Document failed validation"}
+    assert write_failure(failure, "Book") == (400, "Document failed validation")
+
+
+def test_parse_id():
+    assert parse_id(str(ID)) == ID
+    assert parse_id("nope") is None
+
+
+def test_empty_body():
+    with pytest.raises(HTTPException) as error:
+        BulkDeleteSchema(ids=[])
+    assert error.value.status_code == 400
+
+
+def test_oversized_body(monkeypatch):
+    monkeypatch.setattr(bulk, "MAX_BULK_ITEMS", 2)
+    # Rejected on the raw list, before any item is validated.
+    with pytest.raises(HTTPException) as error:
+        BulkDeleteSchema(ids=["a", "b", object()])
+    assert error.value.status_code == 413
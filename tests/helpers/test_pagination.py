@@ -0,0 +1,65 @@
+"""
+Cursor encoding and the keyset filters built from a cursor.
+"""
+
+from beanie import PydanticObjectId
+from datetime import datetime
+from fastapi import HTTPException
+import pytest
+from src.kennapartner_backend.helpers.pagination import (
+    cursor_filter,
+    decode_cursor,
+    encode_cursor,
+)
+
+ID = PydanticObjectId("6650c0ffee0000000000abcd")
+
+
+@pytest.mark.parametrize(
+    "value", [datetime(2024, 5, 1, 12, 30), "Ada Obi", 3.5, None]
+)
+def test_cursor_round_trip(value):
+    assert decode_cursor(encode_cursor(value, ID)) == (value, ID)
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor("?&/+=" * 10, ID)
+    assert set(cursor) <= set(
+        "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+    )
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor",
+        encode_cursor("value", ID)[:-4],
+        # Valid base64 and JSON, but not a cursor payload.
+        "eyJ2IjogMX0",
+        # A payload whose id is not an ObjectId.
+        "eyJ2IjogMSwgImQiOiBmYWxzZSwgImlkIjogIngifQ",
+    ],
+)
+def test_invalid_cursor(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+    assert error.value.status_code == 400
+
+
+def test_cursor_filter():
+    date = datetime(2024, 5, 1)
+    assert cursor_filter("date", encode_cursor(date, ID)) == {
+        "$or": [
+            {"date": {"$lt": date}},
+            {"date": date, "_id": {"$lt": ID}},
+            {"date": None},
+        ]
+    }
+
+
+def test_cursor_filter_after_missing_value():
+    # Documents without the sort key come last and are paged by _id alone.
+    assert cursor_filter("date", encode_cursor(None, ID)) == {
+        "date": None,
+        "_id": {"$lt": ID},
+    }
@@ -0,0 +1,21 @@
+"""
+Detection of stored password hashes that need a new cost factor.
+"""
+
+import pytest
+from src.kennapartner_backend.helpers import password
+
+
+@pytest.mark.parametrize(
+    "hashed, expected",
+    [
+        ("$2b$12$abcdefghijklmnopqrstuuGxv7iXJ1zmQ3Lhq6b6sjiPSl2TMDtGm", False),
+        ("$2b$10$abcdefghijklmnopqrstuuGxv7iXJ1zmQ3Lhq6b6sjiPSl2TMDtGm", True),
+        ("$2a$14$abcdefghijklmnopqrstuuGxv7iXJ1zmQ3Lhq6b6sjiPSl2TMDtGm", True),
+        ("not a bcrypt hash", False),
+        ("$2b$xx$abcdefghijklmnopqrstuu", False),
+    ],
+)
+def test_needs_rehash(monkeypatch, hashed, expected):
+    monkeypatch.setattr(password, "BCRYPT_ROUNDS", 12)
+    assert password.needs_rehash(hashed) is expected
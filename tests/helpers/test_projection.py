@@ -0,0 +1,73 @@
+"""
+Sparse fieldsets: the `$project` stage built from `fields=` and the rows
+rendered from it.
+"""
+
+from fastapi import HTTPException
+import pytest
+from src.kennapartner_backend.helpers import select_fields
+from src.kennapartner_backend.modules.book.schema import BookSummary, SUMMARY_FIELDS
+
+
+def test_default_fields():
+    assert select_fields(BookSummary, None, SUMMARY_FIELDS) == dict.fromkeys(
+        SUMMARY_FIELDS, 1
+    )
+
+
+def test_selected_fields():
+    assert select_fields(BookSummary, " name, id,thumbnail_url ", SUMMARY_FIELDS) == {
+        "name": 1,
+        "file_variants": 1,
+    }
+
+
+@pytest.mark.parametrize("fields", ["", ",", " , "])
+def test_blank_fields_use_the_defaults(fields):
+    assert select_fields(BookSummary, fields, SUMMARY_FIELDS) == dict.fromkeys(
+        SUMMARY_FIELDS, 1
+    )
+
+
+@pytest.mark.parametrize("fields", ["password", "excerpt", "name,$where"])
+def test_unknown_field(fields):
+    with pytest.raises(HTTPException) as error:
+        select_fields(BookSummary, fields, SUMMARY_FIELDS)
+    assert error.value.status_code == 400
+
+
+def test_excerpt():
+    stage = select_fields(
+        BookSummary, "name", SUMMARY_FIELDS, excerpt=("introduction", 40)
+    )
+    assert stage == {
+        "name": 1,
+        "excerpt": {"$substrCP": [{"$ifNull": ["$introduction", ""]}, 0, 40]},
+    }
+
+
+def test_row_renders_only_the_fields_read():
+    row = BookSummary.model_validate(
+        {
+            "_id": "6650c0ffee0000000000abcd",
+            "name": "Book",
+            "file_variants": {"thumbnail": "/media/a-thumbnail.jpg"},
+            "excerpt": "Intro",
+        }
+    )
+    assert row.model_dump(mode="json") == {
+        "id": "6650c0ffee0000000000abcd",
+        "name": "Book",
+        "thumbnail_url": "/media/a-thumbnail.jpg",
+        "excerpt": "Intro",
+    }
+
+
+def test_row_without_variants_has_no_thumbnail():
+    row = BookSummary.model_validate(
+        {"_id": "6650c0ffee0000000000abcd", "file_variants": None}
+    )
+    assert row.model_dump(mode="json") == {
+        "id": "6650c0ffee0000000000abcd",
+        "thumbnail_url": None,
+    }
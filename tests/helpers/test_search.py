@@ -0,0 +1,38 @@
+"""
+Search filters of the list endpoints.
+"""
+
+from src.kennapartner_backend.helpers.search import (
+    PREFIX_COLLATION,
+    search_collation,
+    search_filter,
+    text_search_terms,
+)
+
+
+def test_text_search():
+    assert search_filter("text", "market policy", "name") == {
+        "$text": {"$search": "market policy"}
+    }
+
+
+def test_text_search_drops_phrases_and_negations():
+    assert text_search_terms('"market" -policy - --') == "market policy"
+
+
+def test_prefix_search_is_a_range():
+    assert search_filter("prefix", "Ke", "title") == {
+        "title": {"$gte": "Ke", "$lt": "Ke\uffff"}
+    }
+
+
+def test_prefix_search_does_not_interpret_patterns():
+    assert search_filter("prefix", "a.*(", "title") == {
+        "title": {"$gte": "a.*(", "$lt": "a.*(\uffff"}
+    }
+
+
+def test_collation_of_prefix_searches_only():
+    assert search_collation("prefix", "Ke") == PREFIX_COLLATION
+    assert search_collation("text", "Ke") is None
+    assert search_collation("prefix", None) is None
@@ -0,0 +1,50 @@
+"""
+Cache of verified access tokens.
+"""
+
+from types import SimpleNamespace
+import time
+from src.kennapartner_backend.helpers.token_cache import TokenCache, token_key
+
+ADA = SimpleNamespace(id="6650c0ffee0000000000abcd")
+BAYO = SimpleNamespace(id="6650c0ffee0000000000dcba")
+
+
+def test_hit_and_miss():
+    cache = TokenCache()
+    assert cache.get("token") is None
+
+    cache.set("token", ADA)
+    assert cache.get("token") is ADA
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+
+def test_tokens_are_stored_by_digest():
+    cache = TokenCache()
+    cache.set("token", ADA)
+    assert "token" not in cache.entries
+    assert token_key("token") in cache.entries
+
+
+def test_expired_token_is_not_cached():
+    cache = TokenCache()
+    cache.set("token", ADA, expires_at=time.time() - 1)
+    assert cache.get("token") is None
+
+
+def test_disabled_cache():
+    cache = TokenCache(ttl=0)
+    cache.set("token", ADA)
+    assert cache.get("token") is None
+
+
+def test_invalidate_user():
+    cache = TokenCache()
+    cache.set("first", ADA)
+    cache.set("second", ADA)
+    cache.set("other", BAYO)
+
+    cache.invalidate_user(ADA.id)
+    assert cache.get("first") is None
+    assert cache.get("second") is None
+    assert cache.get("other") is BAYO
@@ -0,0 +1,106 @@
+"""
+Response cache keys, invalidation and validators, on the memory backend.
+"""
+
+from datetime import datetime, timezone
+from starlette.requests import Request
+import pytest
+from src.kennapartner_backend.services.cache import (
+    MemoryCacheBackend,
+    ResponseCache,
+)
+from src.kennapartner_backend.services.cache.response import etag_matches, http_date
+
+pytestmark = pytest.mark.anyio
+
+ETAG = '"0123456789abcdef"'
+
+
+def request(path: str, query: str = "", headers: dict = {}) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": path,
+            "query_string": query.encode(),
+            "headers": [
+                (name.lower().encode(), value.encode())
+                for name, value in headers.items()
+            ],
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "if_none_match, expected",
+    [
+        (None, False),
+        ("", False),
+        (ETAG, True),
+        ("*", True),
+        (f'"other", W/{ETAG}', True),
+        ('"other"', False),
+    ],
+)
+def test_etag_matches(if_none_match, expected):
+    assert etag_matches(if_none_match, ETAG) is expected
+
+
+def test_http_date_of_naive_utc():
+    # Mongo returns naive datetimes that are already in UTC.
+    value = datetime(2024, 5, 1, 12, 30)
+    assert http_date(value) == "Wed, 01 May 2024 12:30:00 GMT"
+    assert http_date(value.replace(tzinfo=timezone.utc)) == http_date(value)
+
+
+async def test_key_ignores_parameter_order():
+    cache = ResponseCache(MemoryCacheBackend())
+    first = await cache.cache_key(request("/api/v1/books/", "page=2&limit=5"), "books")
+    second = await cache.cache_key(
+        request("/api/v1/books/", "limit=5&page=2"), "books"
+    )
+    assert first == second
+
+
+async def test_key_depends_on_path_and_query():
+    cache = ResponseCache(MemoryCacheBackend())
+    keys = {
+        await cache.cache_key(request(path, query), "books")
+        for path, query in [
+            ("/api/v1/books/", ""),
+            ("/api/v1/books/", "page=2"),
+            ("/api/v1/books/6650c0ffee0000000000abcd", ""),
+        ]
+    }
+    assert len(keys) == 3
+
+
+async def test_invalidate_changes_the_keys_of_its_namespace_only():
+    cache = ResponseCache(MemoryCacheBackend())
+    books = await cache.cache_key(request("/api/v1/books/"), "books")
+    news = await cache.cache_key(request("/api/v1/news/"), "news")
+
+    await cache.invalidate("books")
+    assert await cache.cache_key(request("/api/v1/books/"), "books") != books
+    assert await cache.cache_key(request("/api/v1/news/"), "news") == news
+
+
+async def test_cached_response_and_not_modified():
+    cache = ResponseCache(MemoryCacheBackend())
+    updated_at = datetime(2024, 5, 1, 12, 30)
+
+    assert await cache.lookup(request("/api/v1/books/"), "books") is None
+    first = await cache.respond(
+        request("/api/v1/books/"), "books", {"data": []}, last_modified=updated_at
+    )
+    assert first.headers["last-modified"] == http_date(updated_at)
+
+    cached = await cache.lookup(request("/api/v1/books/"), "books")
+    assert cached.status_code == 200
+    assert cached.body == first.body
+
+    revalidated = await cache.lookup(
+        request("/api/v1/books/", headers={"If-None-Match": first.headers["etag"]}),
+        "books",
+    )
+    assert revalidated.status_code == 304
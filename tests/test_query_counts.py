@@ -0,0 +1,99 @@
+"""
+Database round trips of the insight routes.
+
+The limits are fixed per request, not per row: listing a page must not
+load authors one insight at a time. The token cache is disabled in the
+tests, so protected routes include the lookup of the current user.
+"""
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+AUTHORS = [
+    {"full_name": "Ada Obi", "email": "ada@example.com"},
+    {"full_name": "Bayo Eze", "email": "bayo@example.com"},
+    {"full_name": "Chi Musa", "email": "chi@example.com"},
+]
+
+
+async def create_insights(client, headers, count: int) -> list:
+    ids = []
+    for number in range(count):
+        response = await client.post(
+            "/api/v1/insights/",
+            json={
+                "title": f"Insight {number}",
+                "content": "Content",
+                "authors": AUTHORS[: number % len(AUTHORS) + 1],
+            },
+            headers=headers,
+        )
+        assert response.status_code == 201
+        ids.append(response.json()["data"]["insight"]["id"])
+    return ids
+
+
+async def test_list_insight(client, auth_headers, assert_max_queries):
+    await create_insights(client, auth_headers, 12)
+
+    # The page, the estimated total and one lookup of every author shown.
+    with assert_max_queries(3):
+        response = await client.get("/api/v1/insights/?limit=10")
+
+    assert response.status_code == 200
+    assert len(response.json()["data"]["insight"]) == 10
+
+
+async def test_list_insight_filtered(client, auth_headers, assert_max_queries):
+    await create_insights(client, auth_headers, 12)
+
+    # Filtered pages get their exact total from the same aggregation.
+    with assert_max_queries(2):
+        response = await client.get("/api/v1/insights/?search=prefix&query=Insight")
+
+    assert response.status_code == 200
+    assert response.json()["data"]["total_insight"] == 12
+
+
+async def test_get_insight(client, auth_headers, assert_max_queries):
+    [id] = await create_insights(client, auth_headers, 1)
+
+    with assert_max_queries(2):
+        response = await client.get(f"/api/v1/insights/{id}")
+
+    assert response.status_code == 200
+    assert response.json()["data"]["insight"]["authors"][0]["email"] == (
+        AUTHORS[0]["email"]
+    )
+
+
+async def test_create_insight(client, auth_headers, assert_max_queries):
+    # The user, the title check, the author lookup, the upsert of the new
+    # authors and the insert.
+    with assert_max_queries(5):
+        response = await client.post(
+            "/api/v1/insights/",
+            json={"title": "New insight", "content": "Content", "authors": AUTHORS},
+            headers=auth_headers,
+        )
+
+    assert response.status_code == 201
+
+
+async def test_create_book(client, auth_headers, assert_max_queries):
+    with assert_max_queries(2):
+        response = await client.post(
+            "/api/v1/books/",
+            json={
+                "name": "New book",
+                "introduction": "Introduction",
+                "preface": "Preface",
+                "foreword": "Foreword",
+                "author": "Ada Obi",
+                "date": "2024-05-01T00:00:00",
+            },
+            headers=auth_headers,
+        )
+
+    assert response.status_code == 201
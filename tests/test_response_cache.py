@@ -0,0 +1,45 @@
+"""
+Validators of cached responses.
+
+Last-Modified has a resolution of one second, so the tests wait a little
+over a second between the write they check and the one before it.
+"""
+
+import anyio
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+BOOK = {
+    "name": "Cached book",
+    "introduction": "Introduction",
+    "preface": "Preface",
+    "foreword": "Foreword",
+    "author": "Ada Obi",
+    "date": "2024-05-01T00:00:00",
+}
+
+
+async def test_put_moves_last_modified(client, auth_headers):
+    response = await client.post("/api/v1/books/", json=BOOK, headers=auth_headers)
+    assert response.status_code == 201
+    id = response.json()["data"]["book"]["id"]
+
+    before = await client.get(f"/api/v1/books/{id}")
+    assert before.status_code == 200
+
+    await anyio.sleep(1.1)
+    response = await client.put(
+        f"/api/v1/books/{id}",
+        json={**BOOK, "preface": "Second preface"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+
+    after = await client.get(
+        f"/api/v1/books/{id}",
+        headers={"If-None-Match": before.headers["etag"]},
+    )
+    assert after.status_code == 200
+    assert after.json()["data"]["book"]["preface"] == "Second preface"
+    assert after.headers["last-modified"] != before.headers["last-modified"]
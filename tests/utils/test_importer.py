@@ -0,0 +1,110 @@
+"""
+Record readers and the checkpoint of the import command.
+"""
+
+import io
+import json
+import pytest
+from src.kennapartner_backend.utils import importer
+from src.kennapartner_backend.utils.importer import (
+    Progress,
+    clear_checkpoint,
+    detect_format,
+    load_checkpoint,
+    read_csv,
+    read_json,
+    read_ndjson,
+    save_checkpoint,
+)
+
+
+@pytest.mark.parametrize(
+    "source, format",
+    [
+        ("books.csv", "csv"),
+        ("books.JSON", "json"),
+        ("books.ndjson", "ndjson"),
+        ("books.jsonl", "ndjson"),
+        ("-", "ndjson"),
+    ],
+)
+def test_detect_format(source, format):
+    assert detect_format(source) == format
+
+
+def test_ndjson_keeps_the_place_of_bad_lines():
+    records = list(read_ndjson(io.StringIO('{"a": 1}\n\n{broken\n{"a": 2}\n')))
+    assert records[0] == {"a": 1}
+    assert isinstance(records[1], ValueError)
+    assert records[2] == {"a": 2}
+
+
+def test_csv_decodes_nested_columns():
+    stream = io.StringIO(
+        "title,content,authors\n"
+        'One,Text,"[{""full_name"": ""Ada"", ""email"": ""ada@example.com""}]"\n'
+        "Two,Text,not json\n"
+    )
+    records = list(read_csv(stream))
+    assert records[0] == {
+        "title": "One",
+        "content": "Text",
+        "authors": [{"full_name": "Ada", "email": "ada@example.com"}],
+    }
+    assert isinstance(records[1], ValueError)
+
+
+def test_json_array_across_reads(monkeypatch):
+    # Records split across reads are decoded once they are complete.
+    monkeypatch.setattr(importer, "READ_SIZE", 7)
+    records = [{"title": f"Title {number}", "tags": [1, 2]} for number in range(5)]
+    stream = io.StringIO(" [\n" + ",\n".join(map(json.dumps, records)) + "\n] ")
+    assert list(read_json(stream)) == records
+
+
+def test_empty_json_array():
+    assert list(read_json(io.StringIO("[]"))) == []
+
+
+@pytest.mark.parametrize(
+    "content, message",
+    [
+        ('{"title": "One"}', "array"),
+        ('[{"title": "One"}, {"title": ', "closing bracket"),
+    ],
+)
+def test_malformed_json(content, message):
+    with pytest.raises(ValueError, match=message):
+        list(read_json(io.StringIO(content)))
+
+
+def test_checkpoint(tmp_path):
+    path = str(tmp_path / "books.checkpoint")
+    assert load_checkpoint(path) == 0
+
+    save_checkpoint(path, 1500)
+    assert load_checkpoint(path) == 1500
+
+    clear_checkpoint(path)
+    assert load_checkpoint(path) == 0
+
+
+def test_no_checkpoint_file():
+    save_checkpoint(None, 10)
+    assert load_checkpoint(None) == 0
+
+
+def test_checkpoint_follows_finished_batches_in_order(tmp_path):
+    path = str(tmp_path / "books.checkpoint")
+    progress = Progress(path, 100)
+
+    # The batch after the checkpoint is still in flight.
+    progress.finish(200, 300)
+    assert load_checkpoint(path) == 100
+
+    progress.finish(100, 200)
+    assert load_checkpoint(path) == 300
+
+    progress.finish(400, 500)
+    progress.finish(300, 400)
+    assert load_checkpoint(path) == 500